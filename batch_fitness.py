@@ -0,0 +1,69 @@
+from collections import namedtuple
+import numpy as np
+from move_codec import NUMPAD, encode_genes
+from profiling import count, timed
+
+"""Walk a whole population through a maze at once instead of one runner at a time"""
+
+# Per-runner results, every field is an array with one entry per individual
+BatchResult = namedtuple("BatchResult", ["smartness", "moves", "x", "y", "distance"])
+
+
+@timed("walk.batch")
+def evaluate_population(population, maze, goal_bonus=100, stop_at_goal=True, alphabet=NUMPAD):
+    # population: 2-D array, individuals x genes, in any move_codec alphabet
+    # stop_at_goal: a runner is done the moment it reaches the goal and scores
+    # goal_bonus for every gene it had left, in closed form, that's maze_fitness.
+    # stop_at_goal=False, goal_bonus=0 keeps everyone walking, that's score_attempt
+    population = np.asarray(population)
+    if population.ndim != 2:
+        raise ValueError(f"population must be 2-D (individuals x genes), got shape {population.shape}")
+    n, genes = population.shape
+    count("walk.genomes", n)
+    # Gene-major copy, so each step reads one contiguous row
+    steps = np.ascontiguousarray(encode_genes(population, alphabet).T)
+
+    cell = np.full(n, maze.start_cell, dtype=np.intp)
+    smartness = np.zeros(n, dtype=np.int64)
+    moves = np.zeros(n, dtype=np.int64)
+
+    if not stop_at_goal:
+        # Every step is two gathers from the maze's transition tables
+        for i in range(genes):
+            code = steps[i]
+            hit = maze.hits_wall[cell, code]
+            smartness -= hit
+            moves += ~hit
+            cell = maze.next_cell[cell, code]
+    else:
+        # Only runners still on their way are stepped, finished ones are written
+        # back and dropped, so a population sitting on the goal costs path length, not genome length
+        active = np.arange(n)
+        a_cell, a_smartness, a_moves = cell, smartness.copy(), moves.copy()
+        for i in range(genes + 1):
+            arrived = a_cell == maze.goal_cell
+            if arrived.any():
+                done = active[arrived]
+                cell[done] = a_cell[arrived]
+                smartness[done] = a_smartness[arrived] + goal_bonus * (genes - i)
+                moves[done] = a_moves[arrived]
+                keep = ~arrived
+                active, a_cell, a_smartness, a_moves = active[keep], a_cell[keep], a_smartness[keep], a_moves[keep]
+            if i == genes or len(active) == 0:
+                break
+            code = steps[i, active]
+            hit = maze.hits_wall[a_cell, code]
+            a_smartness -= hit
+            a_moves += ~hit
+            a_cell = maze.next_cell[a_cell, code]
+        # Whoever never made it
+        cell[active], smartness[active], moves[active] = a_cell, a_smartness, a_moves
+
+    x, y = cell % maze.cols, cell // maze.cols
+    distance = maze.distance[y, x]
+    return BatchResult(smartness, moves, x, y, distance)
+
+
+def batch_fitness_values(result):
+    # Same (smartness, -distance) pairs maze_fitness returns, as an n x 2 array
+    return np.column_stack((result.smartness, result.distance * -1))
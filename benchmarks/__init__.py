@@ -0,0 +1,2 @@
+"""Benchmarks, run from the repo root: python -m benchmarks for the fixed-seed suite
+(--save / --baseline benchmarks/baseline.json), python -m benchmarks.<name> for the single-topic scripts"""
@@ -0,0 +1,49 @@
+import sys
+import json
+import argparse
+from benchmarks.suite import CASES, run_suite, to_json, compare
+
+"""python -m benchmarks: run the suite, optionally save it as a baseline or check it against one"""
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks")
+    parser.add_argument("--filter", default=None, help="only cases whose name contains this")
+    parser.add_argument("--list", action="store_true", help="list the cases and exit")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    parser.add_argument("--save", default=None, help="write the results to this JSON baseline")
+    parser.add_argument("--baseline", default=None, help="compare against this JSON baseline")
+    parser.add_argument("--threshold", type=float, default=0.10, help="slowdown fraction that counts as a regression")
+    args = parser.parse_args()
+
+    if args.list:
+        for bench_case in CASES:
+            print(bench_case.name)
+        return 0
+
+    print(f"{'case':<42} {'best s':>9} {'items/s':>12} {'peak MB':>8}")
+
+    def report(name, result):
+        print(f"{name:<42} {result.seconds:>9.4f} {result.throughput:>12.1f} {result.peak_mb:>8.1f}", flush=True)
+
+    results = run_suite(args.filter, not args.no_memory, report)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(to_json(results), f, indent=2)
+        print(f"saved {len(results)} results to {args.save}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        changes = compare(results, baseline, args.threshold)
+        print(f"\n{'case':<42} {'vs baseline':>12}")
+        for name, (change, regressed) in changes.items():
+            print(f"{name:<42} {change:>+11.1%} {'REGRESSION' if regressed else ''}")
+        if any(regressed for _, regressed in changes.values()):
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+import time
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import evaluate_population, batch_fitness_values
+from pygad_test import maze_fitness
+
+"""Scalar maze_fitness loop vs. evaluate_population on the same random population"""
+
+POP_SIZES = (100, 1_000, 10_000)
+GENES = 200
+SEED = 12
+
+
+def time_call(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    maze = get_maze(20, 20)
+    rng = np.random.default_rng(SEED)
+
+    print(f"{'pop':>8} {'scalar s':>10} {'batch s':>10} {'speedup':>8}")
+    for pop_size in POP_SIZES:
+        population = rng.choice((4, 8, 6, 2), (pop_size, GENES))
+
+        scalar_time, scalar = time_call(lambda: [maze_fitness(None, g, i) for i, g in enumerate(population)], repeats=1)
+        batch_time, batch = time_call(lambda: batch_fitness_values(evaluate_population(population, maze)))
+
+        # Benchmark is only meaningful if both paths agree
+        assert (np.array(scalar) == batch).all()
+        print(f"{pop_size:>8} {scalar_time:>10.4f} {batch_time:>10.4f} {scalar_time / batch_time:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+import argparse
+import time
+import numpy as np
+from maze_walk import walk_genome
+from batch_fitness import evaluate_population
+from curriculum_fitness import curriculum_mazes, evaluate_stack
+
+"""Cost of scoring on M mazes: maze_fitness's scalar walk per maze, evaluate_population per maze, one stacked pass"""
+
+GENES = 200
+SEED = 12
+
+
+def time_call(fn, repeats=3):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - start)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-size", type=int, default=100)
+    parser.add_argument("--mazes", type=int, nargs="+", default=[2, 8, 32, 128])
+    args = parser.parse_args()
+
+    population = np.random.default_rng(SEED).choice((4, 8, 6, 2), (args.pop_size, GENES))
+    print(f"{'mazes':>6} {'scalar s':>10} {'per-maze s':>11} {'stacked s':>10} {'vs scalar':>10}")
+    for m in args.mazes:
+        # The two sizes the scripts use, 15x15 and 20x20, half of the mazes each
+        stack = curriculum_mazes(range(42, 42 + max(m // 2, 1)), sizes=((15, 15), (20, 20)))
+        mazes = stack.mazes
+
+        scalar_time, scalar = time_call(lambda: [[walk_genome(maze, g)[0] for g in population] for maze in mazes], repeats=1)
+        per_maze_time, _ = time_call(lambda: [evaluate_population(population, maze) for maze in mazes])
+        stacked_time, stacked = time_call(lambda: evaluate_stack(population, stack))
+
+        # Benchmark is only meaningful if both paths agree
+        assert (np.array(scalar) == stacked.smartness).all()
+        print(f"{len(mazes):>6} {scalar_time:>10.4f} {per_maze_time:>11.4f} {stacked_time:>10.4f} {scalar_time / stacked_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+import argparse
+import time
+import pygad
+from ga_engine import GAEngine
+from pygad_test import GA_CONFIG, create_population, maze_fitness_batch
+from rng_streams import RunStreams
+
+"""Generations per second of pygad.GA and ga_engine.GAEngine on the same GA_CONFIG and batched maze fitness"""
+
+SEED = 12
+
+
+def build(ga_class, pop_size, generations):
+    streams = RunStreams(SEED)
+    return ga_class(fitness_func=maze_fitness_batch,
+                    fitness_batch_size=pop_size,
+                    initial_population=create_population(pop_size, streams.generator("population")),
+                    random_seed=streams if ga_class is GAEngine else streams.int_seed("ga"),
+                    **dict(GA_CONFIG, num_generations=generations))
+
+
+def generations_per_second(ga_class, pop_size, generations):
+    ga_instance = build(ga_class, pop_size, generations)
+    start = time.perf_counter()
+    ga_instance.run()
+    return generations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    # pygad's multi-objective sort is quadratic in the population (~30 s a generation at 1000),
+    # past --pygad-max-pop only the native engine is timed
+    parser.add_argument("--pygad-generations", type=int, default=2)
+    parser.add_argument("--pygad-max-pop", type=int, default=1000)
+    parser.add_argument("--native-generations", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'pop':>7} {'pygad gen/s':>12} {'native gen/s':>13} {'speedup':>8}")
+    for pop_size in args.pop_sizes:
+        native_rate = generations_per_second(GAEngine, pop_size, args.native_generations)
+        if pop_size > args.pygad_max_pop:
+            print(f"{pop_size:>7} {'-':>12} {native_rate:>13.2f} {'-':>8}")
+            continue
+        pygad_rate = generations_per_second(pygad.GA, pop_size, args.pygad_generations)
+        print(f"{pop_size:>7} {pygad_rate:>12.2f} {native_rate:>13.2f} {native_rate / pygad_rate:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
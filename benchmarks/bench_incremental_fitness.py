@@ -0,0 +1,51 @@
+import argparse
+import time
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import evaluate_population
+from incremental_fitness import IncrementalEvaluator
+from pygad_test import GA_CONFIG, ROWS, COLS, build_ga
+
+"""evaluate_population vs. IncrementalEvaluator on the populations of a real GA run, where children share prefixes with their parents"""
+
+
+def record_generations(pop_size, generations, engine):
+    # Every population the GA evaluates, in order, the initial one included
+    populations = []
+
+    def on_generation(ga_instance):
+        populations.append(np.array(ga_instance.population))
+
+    ga_instance = build_ga(fitness_batch_size=pop_size, pop_size=pop_size, on_generation=on_generation, engine=engine,
+                           config=dict(GA_CONFIG, num_generations=generations))
+    populations.append(np.array(ga_instance.population))
+    ga_instance.run()
+    return populations
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-sizes", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--generations", type=int, default=200)
+    parser.add_argument("--engine", choices=("pygad", "native"), default="native", help="GA that produces the populations")
+    args = parser.parse_args()
+
+    maze = get_maze(ROWS, COLS)
+    print(f"{'pop':>6} {'batch s':>9} {'incremental s':>14} {'speedup':>8} {'genes skipped':>14}")
+    for pop_size in args.pop_sizes:
+        populations = record_generations(pop_size, args.generations, args.engine)
+        start = time.perf_counter()
+        for population in populations:
+            evaluate_population(population, maze)
+        batch = time.perf_counter() - start
+
+        evaluator = IncrementalEvaluator(maze)
+        start = time.perf_counter()
+        for population in populations:
+            evaluator.evaluate(population)
+        incremental = time.perf_counter() - start
+        print(f"{pop_size:>6} {batch:>9.3f} {incremental:>14.3f} {batch / incremental:>7.2f}x {evaluator.saved_fraction():>13.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import os
+import time
+import pygad
+from pygad_test import GA_CONFIG, create_population, maze_fitness_batch
+from island_ga import run_islands
+
+"""Best fitness reached in the same wall-clock budget: one serial population vs. the island model"""
+
+# Smallest island worth running, GA_CONFIG mates 6 parents per generation
+MIN_ISLAND_SIZE = 10
+
+
+def run_serial(pop_size, time_budget):
+    start = time.perf_counter()
+    ga_instance = pygad.GA(**dict(GA_CONFIG,
+                                  num_generations = 1_000_000,
+                                  fitness_func = maze_fitness_batch,
+                                  fitness_batch_size = pop_size,
+                                  initial_population = create_population(pop_size),
+                                  random_seed = 12,
+                                  suppress_warnings = True,
+                                  # pygad stops the run when on_generation returns "stop"
+                                  on_generation = lambda ga: "stop" if time.perf_counter() - start >= time_budget else None))
+    ga_instance.run()
+    best = ga_instance.best_solution(ga_instance.last_generation_fitness)[1]
+    return best, ga_instance.generations_completed, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--seconds", type=float, default=30.0)
+    parser.add_argument("--pop-size", type=int, default=100)
+    parser.add_argument("--islands", type=int, default=None,
+                        help=f"default one per CPU, as many as --pop-size allows at {MIN_ISLAND_SIZE} per island")
+    parser.add_argument("--migration-interval", type=int, default=20)
+    args = parser.parse_args()
+    if args.islands is None:
+        args.islands = max(1, min(os.cpu_count() or 1, args.pop_size // MIN_ISLAND_SIZE))
+    # Same total population, split over the islands, so islands can't be padded up to a minimum
+    island_size = args.pop_size // args.islands
+    if island_size < MIN_ISLAND_SIZE:
+        parser.error(f"{args.islands} islands leave {island_size} individuals each out of --pop-size {args.pop_size}, "
+                     f"need at least {MIN_ISLAND_SIZE} per island")
+
+    best, generations, elapsed = run_serial(args.pop_size, args.seconds)
+    print(f"serial   pop={args.pop_size:<6} generations={generations:<6} seconds={elapsed:6.1f} best={best}")
+
+    result = run_islands(num_islands=args.islands, island_size=island_size, epochs=1_000_000,
+                         migration_interval=args.migration_interval, time_budget=args.seconds)
+    print(f"islands  k={args.islands:<2} size={island_size:<4} generations={result.generations:<6} "
+          f"seconds={result.history[-1].seconds:6.1f} best={result.best_fitness}")
+
+
+if __name__ == "__main__":
+    main()
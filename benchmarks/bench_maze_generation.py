@@ -0,0 +1,80 @@
+import argparse
+import random
+import time
+import tracemalloc
+from maze_generators import GENERATORS, generate_maze
+
+"""Generation time and peak memory per maze generator, plus the original list-of-lists backtracker"""
+
+SEED = 42
+# Wilson's first random walks grow with the grid, past this it takes minutes
+WILSON_MAX_SIZE = 1000
+# The list-of-lists backtracker with its set of visited tuples, kept for comparison
+LEGACY_MAX_SIZE = 1000
+
+
+def legacy_carve(rows, cols, seed):
+    # The scripts' generate_solvable_maze before maze_generators, goal handling left out
+    rng = random.Random(seed)
+    maze = [[1 for _ in range(cols)] for _ in range(rows)]
+    maze[0][0] = 0
+    stack = [(0, 0)]
+    visited = set(stack)
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+    while stack:
+        x, y = stack[-1]
+        neighbors = []
+        for dx, dy in directions:
+            nx, ny = x + dx * 2, y + dy * 2
+            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
+                neighbors.append((nx, ny))
+        if neighbors:
+            nx, ny = rng.choice(neighbors)
+            maze[(y + ny) // 2][(x + nx) // 2] = 0
+            maze[ny][nx] = 0
+            visited.add((nx, ny))
+            stack.append((nx, ny))
+        else:
+            stack.pop()
+    return maze
+
+
+def measure(build, memory=True):
+    # Timed on its own, tracemalloc slows pure-Python loops several times over,
+    # then built again under tracemalloc for the peak
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    if not memory:
+        return result, elapsed, float("nan")
+    del result
+    tracemalloc.start()
+    result = build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 4000])
+    parser.add_argument("--algorithms", nargs="+", default=list(GENERATORS), choices=list(GENERATORS))
+    parser.add_argument("--no-legacy", action="store_true")
+    parser.add_argument("--no-memory", action="store_true", help="skip the tracemalloc pass")
+    args = parser.parse_args()
+
+    print(f"{'algorithm':<10} {'size':>6} {'seconds':>8} {'peak MB':>9} {'grid MB':>8}")
+    for size in args.sizes:
+        rows = [(name, lambda name=name: generate_maze(size, size, SEED, name)) for name in args.algorithms
+                if name != "wilson" or size <= WILSON_MAX_SIZE]
+        if not args.no_legacy and size <= LEGACY_MAX_SIZE:
+            rows.append(("legacy", lambda: legacy_carve(size, size, SEED)))
+        for name, build in rows:
+            grid, elapsed, peak = measure(build, not args.no_memory)
+            grid_mb = grid.nbytes / 2**20 if hasattr(grid, "nbytes") else float("nan")
+            del grid
+            print(f"{name:<10} {size:>6} {elapsed:>8.2f} {peak / 2**20:>9.1f} {grid_mb:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+import argparse
+import os
+import time
+import numpy as np
+from parallel_fitness import ParallelEvaluator
+
+"""Wall time of ParallelEvaluator.evaluate for 1..N workers on one fixed population"""
+
+GENES = 200
+SEED = 12
+
+
+def worker_counts(max_workers):
+    # 1, 2, 4, ... up to and including max_workers
+    counts = []
+    n = 1
+    while n < max_workers:
+        counts.append(n)
+        n *= 2
+    counts.append(max_workers)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-size", type=int, default=100_000)
+    parser.add_argument("--max-workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--chunk-size", type=int, default=2_048)
+    args = parser.parse_args()
+
+    population = np.random.default_rng(SEED).choice((4, 8, 6, 2), (args.pop_size, GENES))
+
+    reference = None
+    baseline = None
+    print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+    for workers in worker_counts(args.max_workers):
+        with ParallelEvaluator(workers=workers, chunk_size=args.chunk_size) as evaluator:
+            evaluator.evaluate(population[:args.chunk_size])  # warm up the pool outside the timing
+            start = time.perf_counter()
+            result = evaluator.evaluate(population)
+            elapsed = time.perf_counter() - start
+
+        # Every worker count has to give identical results
+        if reference is None:
+            reference, baseline = result, elapsed
+        assert (result == reference).all()
+        print(f"{workers:>8} {elapsed:>10.4f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
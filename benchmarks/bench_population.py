@@ -0,0 +1,43 @@
+import argparse
+import time
+import tracemalloc
+import numpy as np
+from population import Population
+
+"""Memory and build time: list of per-individual arrays vs. Population's uint8 matrix and its 2-bit packing"""
+
+GENES = 200
+SEED = 12
+
+
+def measure(build):
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    held, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, held, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-size", type=int, default=1_000_000)
+    args = parser.parse_args()
+    n = args.pop_size
+
+    rows = [
+        # What pygad_test.create_population used to build
+        ("list of int arrays", lambda: [np.random.choice((4, 8, 6, 2), GENES) for _ in range(n)]),
+        ("Population uint8", lambda: Population.random(n, GENES, np.random.default_rng(SEED))),
+        ("Population 2-bit", lambda: Population.random(n, GENES, np.random.default_rng(SEED)).pack()),
+    ]
+    print(f"{'layout':<20} {'seconds':>8} {'held MB':>9} {'peak MB':>9}")
+    for name, build in rows:
+        result, elapsed, held, peak = measure(build)
+        del result
+        print(f"{name:<20} {elapsed:>8.2f} {held / 2**20:>9.1f} {peak / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import math
+import time
+import numpy as np
+from selection import select, SELECTION_MODES
+
+"""Selection time per mode for populations up to 10^6, next to the old sort + scores.index version"""
+
+POP_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+TOP_N = .01  # same fraction dumb_simple_maze.main selects
+SEED = 12
+
+
+def legacy_select_best_individuals(scores, top_n):
+    # What dumb_simple_maze.select_best_individuals did before selection.py
+    top_individuals = sorted(scores)[-math.ceil(len(scores)*top_n)::]
+    return [scores.index(i) for i in top_individuals]
+
+
+def time_call(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    rng = np.random.default_rng(SEED)
+    print(f"{'pop':>9} {'legacy s':>10} " + " ".join(f"{mode + ' s':>12}" for mode in SELECTION_MODES))
+    for pop_size in POP_SIZES:
+        # Integer smartness-like scores, so ties are common
+        scores = rng.integers(-200, 0, pop_size)
+        k = math.ceil(pop_size * TOP_N)
+
+        score_list = scores.tolist()
+        legacy = time_call(lambda: legacy_select_best_individuals(score_list, TOP_N))
+        timings = [time_call(lambda: select(scores, k, mode, rng=rng)) for mode in SELECTION_MODES]
+        print(f"{pop_size:>9} {legacy:>10.4f} " + " ".join(f"{t:>12.4f}" for t in timings))
+
+
+if __name__ == "__main__":
+    main()
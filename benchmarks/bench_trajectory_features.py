@@ -0,0 +1,42 @@
+import argparse
+import time
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import evaluate_population
+from trajectory_features import FEATURES, evaluate_features
+
+"""What the extra walk features cost: evaluate_population vs. evaluate_features on the same population, one feature at a time and all together"""
+
+SEED = 12
+
+
+def time_call(fn, repeats=5):
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pop-size", type=int, default=1000)
+    parser.add_argument("--genes", type=int, default=400)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 500])
+    args = parser.parse_args()
+
+    population = np.random.default_rng(SEED).choice((4, 8, 6, 2), (args.pop_size, args.genes))
+    print(f"{'maze':>6} {'stop':>5} {'features':<16} {'seconds':>9} {'overhead':>9}")
+    for size in args.sizes:
+        maze = get_maze(size, size)
+        for stop_at_goal in (True, False):
+            plain = time_call(lambda: evaluate_population(population, maze, stop_at_goal=stop_at_goal))
+            print(f"{size:>6} {str(stop_at_goal):>5} {'none (plain)':<16} {plain:>9.4f}")
+            for name, features in [(name, (name,)) for name in FEATURES] + [("all", FEATURES)]:
+                seconds = time_call(lambda: evaluate_features(population, maze, stop_at_goal=stop_at_goal, features=features))
+                print(f"{size:>6} {str(stop_at_goal):>5} {name:<16} {seconds:>9.4f} {seconds / plain - 1:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
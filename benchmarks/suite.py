@@ -0,0 +1,154 @@
+import time
+import platform
+import tracemalloc
+from collections import namedtuple
+import numpy as np
+
+"""Fixed-seed benchmark cases for the whole pipeline, timed, memory-traced and compared against a JSON baseline"""
+
+SEED = 12
+
+# setup() does the untimed preparation and returns the zero-argument callable that gets timed.
+# units is how many items (mazes, genomes, queries, generations) one call handles, for throughput
+Case = namedtuple("Case", ["name", "setup", "units", "repeats"])
+Result = namedtuple("Result", ["seconds", "throughput", "peak_mb"])
+
+CASES = []
+
+
+def case(name, units, repeats=5):
+    def register(setup):
+        CASES.append(Case(name, setup, units, repeats))
+        return setup
+    return register
+
+
+def _cold_maze(size):
+    from maze_provider import get_maze, clear_maze_cache
+
+    def build():
+        # What generate_solvable_maze costs the first time, carve + distance field + tables
+        clear_maze_cache()
+        return get_maze(size, size)
+    return build
+
+
+for size, repeats in ((20, 20), (100, 5), (1000, 1)):
+    case(f"maze.generate[{size}]", units=1, repeats=repeats)(lambda size=size: _cold_maze(size))
+
+
+def _genomes(n, length=200, values=(4, 8, 6, 2)):
+    return np.random.default_rng(SEED).choice(values, (n, length))
+
+
+@case("fitness.maze_fitness[x1000]", units=1000, repeats=3)
+def _maze_fitness():
+    from pygad_test import maze_fitness
+    population = _genomes(1000)
+    return lambda: [maze_fitness(None, genome, i) for i, genome in enumerate(population)]
+
+
+@case("fitness.maze_fitness_batch[1000]", units=1000)
+def _maze_fitness_batch():
+    from pygad_test import maze_fitness_batch
+    population = _genomes(1000)
+    return lambda: maze_fitness_batch(None, population, None)
+
+
+# score_attempt reads 8/2/4/6 genes, both cases walk the same numpad genomes so they do the same work
+@case("fitness.score_attempt[x1000]", units=1000, repeats=3)
+def _score_attempt():
+    from dumb_simple_maze import score_attempt
+    population = _genomes(1000, 130)
+    return lambda: [score_attempt(genome) for genome in population]
+
+
+@case("fitness.score_attempt_batch[1000]", units=1000)
+def _score_attempt_batch():
+    from maze_provider import get_maze
+    from batch_fitness import evaluate_population
+    maze = get_maze(15, 15, goal_policy="center")
+    population = _genomes(1000, 130)
+    return lambda: evaluate_population(population, maze, goal_bonus=0, stop_at_goal=False)
+
+
+@case("bfs.shortest_path_distance[x100]", units=100, repeats=3)
+def _shortest_path():
+    from maze_provider import get_maze, shortest_path_distance
+    maze = get_maze(20, 20)
+    open_cells = np.argwhere(maze.walls == 0)
+    starts = [(int(x), int(y)) for y, x in open_cells[np.random.default_rng(SEED).choice(len(open_cells), 100)]]
+    return lambda: [shortest_path_distance(maze.grid, start, maze.goal) for start in starts]
+
+
+@case("selection.select_best_individuals[10000]", units=10_000)
+def _select_best():
+    from dumb_simple_maze import select_best_individuals
+    population = list(range(10_000))
+    scores = np.random.default_rng(SEED).integers(-200, 0, 10_000).tolist()
+    return lambda: select_best_individuals(population, scores, .01)
+
+
+GA_GENERATIONS = 10
+
+
+@case(f"ga.run[{GA_GENERATIONS} gens]", units=GA_GENERATIONS, repeats=1)
+def _ga_run():
+    from pygad_test import build_ga
+
+    def run():
+        ga_instance = build_ga(fitness_batch_size=100, seed=SEED)
+        ga_instance.num_generations = GA_GENERATIONS
+        ga_instance.run()
+        return ga_instance
+    return run
+
+
+def measure(bench_case, memory=True):
+    fn = bench_case.setup()
+    best = float("inf")
+    for _ in range(bench_case.repeats):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    peak = float("nan")
+    if memory:
+        # Separate pass, tracemalloc slows Python code down too much to time under it
+        tracemalloc.start()
+        fn()
+        peak = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return Result(best, bench_case.units / best, peak)
+
+
+def run_suite(name_filter=None, memory=True, report=print):
+    results = {}
+    for bench_case in CASES:
+        if name_filter and name_filter not in bench_case.name:
+            continue
+        results[bench_case.name] = result = measure(bench_case, memory)
+        report(bench_case.name, result)
+    return results
+
+
+def environment():
+    import pygad
+    return {"python": platform.python_version(), "numpy": np.__version__, "pygad": pygad.__version__,
+            "machine": platform.machine(), "system": platform.system()}
+
+
+def to_json(results):
+    return {"environment": environment(),
+            "results": {name: result._asdict() for name, result in results.items()}}
+
+
+def compare(results, baseline, threshold=0.10):
+    # {name: (change in seconds as a fraction, is_regression)} for cases in both runs
+    changes = {}
+    for name, result in results.items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        change = result.seconds / before["seconds"] - 1
+        changes[name] = (change, change > threshold)
+    return changes
@@ -0,0 +1,161 @@
+from functools import partial
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import BatchResult
+from move_codec import DIRECTION_STEPS, NUMPAD, encode_genes
+from profiling import count, timed
+
+"""Score every genome on a whole set of mazes in one batched walk, then reduce over the mazes"""
+
+# Reducers turn a mazes x individuals array into one value per individual
+REDUCERS = {
+    "mean": np.mean,
+    "min": np.min,
+    "max": np.max,
+    "median": np.median,
+}
+
+
+def quantile_reducer(q):
+    # e.g. quantile_reducer(0.25), "how well does it do on its worse mazes" without being as harsh as min
+    return partial(np.quantile, q=q)
+
+
+def resolve_reducer(reducer):
+    # A REDUCERS name, "q0.25" for a quantile, or any callable(values, axis=...)
+    if callable(reducer):
+        return reducer
+    if reducer in REDUCERS:
+        return REDUCERS[reducer]
+    if isinstance(reducer, str) and reducer.startswith("q"):
+        return quantile_reducer(float(reducer[1:]))
+    raise ValueError(f"reducer must be one of {tuple(REDUCERS)}, 'q<0..1>' or a callable, got {reducer!r}")
+
+
+class MazeStack:
+    # M compiled mazes stacked into one (M, rows, cols) grid, smaller mazes padded
+    # with walls up to the biggest one. Cells are numbered m * rows * cols + y * cols + x,
+    # so one pair of transition tables covers every maze and a single gather steps
+    # every runner in every maze at once
+
+    def __init__(self, mazes):
+        mazes = list(mazes)
+        if not mazes:
+            raise ValueError("MazeStack needs at least one maze")
+        self.mazes = mazes
+        self.rows = max(maze.rows for maze in mazes)
+        self.cols = max(maze.cols for maze in mazes)
+        plane = self.rows * self.cols
+        cells = len(mazes) * plane
+
+        self.walls = np.ones((len(mazes), self.rows, self.cols), dtype=np.uint8)
+        self.distance = np.full((len(mazes), self.rows, self.cols), -1, dtype=np.int64)
+        # Padding cells are walls nobody can reach, they just stay put
+        self.next_cell = np.repeat(np.arange(cells, dtype=np.int32)[:, None], len(DIRECTION_STEPS), axis=1)
+        self.hits_wall = np.ones((cells, len(DIRECTION_STEPS)), dtype=bool)
+        self.start_cell = np.arange(len(mazes), dtype=np.intp) * plane
+        self.goal_cell = np.empty(len(mazes), dtype=np.intp)
+
+        for m, maze in enumerate(mazes):
+            self.walls[m, :maze.rows, :maze.cols] = maze.walls
+            self.distance[m, :maze.rows, :maze.cols] = maze.distance
+            local = self._stacked_cells(m, maze, np.arange(maze.rows * maze.cols))
+            self.next_cell[local] = self._stacked_cells(m, maze, maze.next_cell)
+            self.hits_wall[local] = maze.hits_wall
+            self.start_cell[m] = self._stacked_cells(m, maze, maze.start_cell)
+            self.goal_cell[m] = self._stacked_cells(m, maze, maze.goal_cell)
+
+        for table in (self.walls, self.distance, self.next_cell, self.hits_wall):
+            table.flags.writeable = False
+
+    def _stacked_cells(self, m, maze, cells):
+        # Cell y * maze.cols + x of mazes[m] to its stacked number
+        return m * self.rows * self.cols + (cells // maze.cols) * self.cols + cells % maze.cols
+
+    def __len__(self):
+        return len(self.mazes)
+
+
+def curriculum_mazes(seeds, sizes=((20, 20),), goal_policy="corner", algorithm="dfs"):
+    # Every (size, seed) pair through get_maze, so each layout is still built only once.
+    # e.g. curriculum_mazes(range(42, 50), sizes=[(15, 15), (20, 20)])
+    return MazeStack(get_maze(rows, cols, seed, goal_policy, algorithm) for rows, cols in sizes for seed in seeds)
+
+
+@timed("walk.stack")
+def evaluate_stack(population, stack, goal_bonus=100, stop_at_goal=True, alphabet=NUMPAD):
+    # evaluate_population over every maze in the stack at once. BatchResult fields
+    # are mazes x individuals, row m is exactly evaluate_population(population, stack.mazes[m])
+    population = np.asarray(population)
+    if population.ndim != 2:
+        raise ValueError(f"population must be 2-D (individuals x genes), got shape {population.shape}")
+    n, genes = population.shape
+    m = len(stack)
+    count("walk.genomes", m * n)
+    # Gene-major copy, so each step reads one contiguous row shared by all mazes
+    steps = np.ascontiguousarray(encode_genes(population, alphabet).T)
+
+    cell = np.repeat(stack.start_cell, n)
+    smartness = np.zeros(m * n, dtype=np.int64)
+    moves = np.zeros(m * n, dtype=np.int64)
+
+    if not stop_at_goal:
+        cell = cell.reshape(m, n)
+        smartness, moves = smartness.reshape(m, n), moves.reshape(m, n)
+        for i in range(genes):
+            code = steps[i]
+            hit = stack.hits_wall[cell, code]
+            smartness -= hit
+            moves += ~hit
+            cell = stack.next_cell[cell, code]
+        cell = cell.ravel()
+    else:
+        # Runners are flattened maze-major, runner r walks genome r % n in maze r // n.
+        # Same write-back-and-drop scheme as evaluate_population
+        active = np.arange(m * n)
+        a_goal = np.repeat(stack.goal_cell, n)
+        a_cell, a_smartness, a_moves = cell.copy(), smartness.copy(), moves.copy()
+        for i in range(genes + 1):
+            arrived = a_cell == a_goal
+            if arrived.any():
+                done = active[arrived]
+                cell[done] = a_cell[arrived]
+                smartness[done] = a_smartness[arrived] + goal_bonus * (genes - i)
+                moves[done] = a_moves[arrived]
+                keep = ~arrived
+                active, a_goal = active[keep], a_goal[keep]
+                a_cell, a_smartness, a_moves = a_cell[keep], a_smartness[keep], a_moves[keep]
+            if i == genes or len(active) == 0:
+                break
+            code = steps[i, active % n]
+            hit = stack.hits_wall[a_cell, code]
+            a_smartness -= hit
+            a_moves += ~hit
+            a_cell = stack.next_cell[a_cell, code]
+        cell[active], smartness[active], moves[active] = a_cell, a_smartness, a_moves
+
+    local = cell % (stack.rows * stack.cols)
+    x, y = local % stack.cols, local // stack.cols
+    distance = stack.distance.ravel()[cell]
+    return BatchResult(*(field.reshape(m, n) for field in (smartness, moves, x, y, distance)))
+
+
+def curriculum_fitness_values(result, reducer="mean"):
+    # n x 2 array of (smartness, -distance), each reduced over the mazes axis
+    reduce = resolve_reducer(reducer)
+    return np.column_stack((reduce(result.smartness, axis=0), reduce(result.distance * -1, axis=0)))
+
+
+class CurriculumFitness:
+    # Batched pygad fitness_func that scores on every maze in a MazeStack, e.g.
+    #   build_ga(evaluator = CurriculumFitness(curriculum_mazes(range(42, 50)), reducer = "min"))
+
+    def __init__(self, stack, reducer="mean", goal_bonus=100, alphabet=NUMPAD):
+        self.stack = stack
+        self.reducer = resolve_reducer(reducer)
+        self.goal_bonus = goal_bonus
+        self.alphabet = alphabet
+
+    def __call__(self, ga_instance, solutions, solution_indices):
+        result = evaluate_stack(solutions, self.stack, self.goal_bonus, alphabet=self.alphabet)
+        return curriculum_fitness_values(result, self.reducer)
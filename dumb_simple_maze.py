@@ -1,19 +1,23 @@
-import random
 import numpy as np
 import pandas as pd
 import math
+from maze_provider import get_maze
+from maze_walk import walk_genome
+from selection import truncation_select
+from population import Population
+from move_codec import WASD
 
 """Genetic Stuff with Populations and Associated Genetic Functions"""
 
 ### Create population of maze runners
-def create_population(pop_size):
-    return [np.random.choice(('a','s','w','d'),130) for x in range(0,pop_size)]
+def create_population(pop_size, seed = None):
+    # One uint8 matrix from a single RNG call on its own Generator, decoded to w/a/s/d
+    return Population.random(pop_size, 130, np.random.default_rng(seed)).to_genes(WASD)
 
 def select_best_individuals(population, scores, top_n):
-    top_individuals = sorted(scores)[-math.ceil(len(population)*top_n)::]
-    #print(top_individuals)
-    top_genomes = [scores.index(i) for i in top_individuals]
-    #print(top_genomes)
+    # Top top_n fraction of the population, worst of the selected first and best last.
+    # Tied scores give different individuals instead of the first match over and over
+    top_genomes = truncation_select(scores, math.ceil(len(population)*top_n))[::-1]
     selected_individuals = [population[i] for i in top_genomes]
     return selected_individuals
 
@@ -21,51 +25,8 @@ def select_best_individuals(population, scores, top_n):
 ### Do Maze Stuff
 ROWS,COLS = 15, 15 # Small 15x15 maze for simplicity
 def generate_solvable_maze(rows, cols, seed=42):
-    # Set the random seed for reproducibility
-    random.seed(seed)
-    
-    # Initialize all cells as walls
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    
-    # Starting position
-    start_x, start_y = 0, 0
-    maze[start_y][start_x] = 0  # Start point is open
-    
-    # Stack for DFS and visited set
-    stack = [(start_x, start_y)]
-    visited = set(stack)
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    # DFS to carve out the maze
-    while stack:
-        x, y = stack[-1]
-        
-        # Find all unvisited neighbors
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx * 2, y + dy * 2
-            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
-                neighbors.append((nx, ny))
-
-        if neighbors:
-            # Choose a random neighbor
-            nx, ny = random.choice(neighbors)
-            
-            # Remove wall between current cell and chosen neighbor
-            maze[(y + ny) // 2][(x + nx) // 2] = 0
-            maze[ny][nx] = 0  # Make the neighbor cell a path
-            
-            # Mark as visited and push to stack
-            visited.add((nx, ny))
-            stack.append((nx, ny))
-        else:
-            # Backtrack if no unvisited neighbors
-            stack.pop()
-
-    # Ensure the center of the maze is open
-    maze[rows // 2][cols // 2] = 0
-    return maze
+    # Built once per (rows, cols, seed) by maze_provider, this hands back a mutable copy
+    return get_maze(rows, cols, seed, goal_policy="center").to_list()
 
 
 # Calculate Manhattan distance to the center
@@ -90,30 +51,11 @@ def print_maze(maze, player_pos):
 maze_runner = [8, 6, 4, 2, 2, 4, 6, 4, 8, 6, 4, 4, 8, 6, 2, 6, 8, 6, 6, 4, 8, 6, 6, 4, 8, 2, 8, 8, 8, 2, 8, 8, 6, 8, 8, 8, 2, 8, 2, 8, 6, 2, 2, 8, 2, 4, 6, 6, 2, 2, 4, 8, 8, 4, 8, 4, 4, 6, 8, 2, 4, 6, 2, 4, 8, 2, 4, 6, 2, 8, 2, 4, 8, 8, 4, 6, 4, 2, 2, 8, 8, 2, 2, 2, 4, 4, 8, 6, 4, 4, 2, 6, 2, 6, 8, 8, 2, 4, 6, 8, 8, 8, 2, 2, 2, 8, 8, 6, 8, 6, 4, 4, 6, 2, 6, 6, 6, 8, 4, 6, 6, 6, 2, 8, 2, 4, 8, 2, 2, 2]
 
 def score_attempt(maze_runner):
-    # Run first maze-runner through maze
-    maze = generate_solvable_maze(ROWS, COLS)
-    player_pos = [0, 0]  # Starting position (top-left corner)
+    # Run first maze-runner through maze, genes are read as 8/2/4/6 and it keeps walking past the center
+    maze = get_maze(ROWS, COLS, goal_policy="center")
     center_pos = [ROWS // 2, COLS // 2]
-    moves = 0
-    smartness = 0 #indicator of not running into walls
-
-    for move in maze_runner:
-            x, y = player_pos # x = columns and y = rows
-            if move == 8 and y > 0 and maze[y - 1][x] == 0:  # Move up
-                player_pos[1] -= 1
-                moves += 1
-            elif move == 2 and y < ROWS - 1 and maze[y + 1][x] == 0:  # Move down
-                player_pos[1] += 1
-                moves += 1
-            elif move == 4 and x > 0 and maze[y][x - 1] == 0:  # Move left
-                player_pos[0] -= 1
-                moves += 1
-            elif move == 6 and x < COLS - 1 and maze[y][x + 1] == 0:  # Move right
-                player_pos[0] += 1
-                moves += 1
-            else:
-                #print(f"Move '{move}' hit a wall or is out of bounds!")
-                smartness-=1
+    smartness, moves, x, y = walk_genome(maze, maze_runner, goal_bonus=0, stop_at_goal=False) # smartness = indicator of not running into walls
+    player_pos = [x, y]
 
         # Final distance to the center after the sequence
     distance_to_center = calculate_distance(player_pos[0], player_pos[1], center_pos[0], center_pos[1])
@@ -0,0 +1,228 @@
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import multiprocessing
+import os
+import time
+from collections import defaultdict, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import evaluate_population, batch_fitness_values
+from selection import fitness_order
+from pygad_test import GA_CONFIG, build_ga
+
+"""Sweep GA configurations on a bounded process pool from an asyncio loop, stopping clearly losing runs early"""
+
+# Trial parameters that aren't GA_CONFIG keys. maze_size n is an n x n maze walked by
+# 10 * n genes, 20 gives pygad_test's 20 x 20 maze and 200 genes
+RUN_PARAMS = {"maze_size": 20, "pop_size": 100, "seed": 12, "engine": "native"}
+# What pygad_test.py used to get swept by hand
+DEFAULT_SPACE = {
+    "num_parents_mating": [4, 6, 10],
+    "crossover_probability": [.2, .4, .8],
+    "mutation_percent_genes": [1, 2, 5],
+    "maze_size": [15, 20],
+}
+
+TrialResult = namedtuple("TrialResult", ["trial", "params", "generations", "best_fitness", "stopped", "seconds"])
+
+
+def grid_search(space):
+    # Every combination of the listed values, in a stable order
+    names = list(space)
+    return [dict(zip(names, values)) for values in itertools.product(*(space[name] for name in names))]
+
+
+def random_search(space, samples, seed=0):
+    # samples configurations: a list is picked from, a (low, high) pair is sampled
+    # uniformly, as integers when both ends are ints
+    rng = np.random.default_rng(seed)
+    configs = []
+    for _ in range(samples):
+        config = {}
+        for name, values in space.items():
+            if isinstance(values, tuple):
+                low, high = values
+                value = rng.integers(low, high + 1) if isinstance(low, int) and isinstance(high, int) else rng.uniform(low, high)
+            else:
+                value = values[rng.integers(len(values))]
+            config[name] = value.item() if isinstance(value, np.generic) else value
+        configs.append(config)
+    return configs
+
+
+def problem_of(params):
+    # Trials only compare against trials on the same maze, the fitness scale (distance,
+    # goal bonus per remaining gene) depends on its size
+    return params.get("maze_size", RUN_PARAMS["maze_size"])
+
+
+def fitness_key(value):
+    # Sortable, larger is better: maze_fitness pairs rank like selection.fitness_order
+    # (distance first, then smartness), a single objective is itself
+    value = np.ravel(value).tolist()
+    return tuple(value[::-1])
+
+
+def run_trial(trial, params, generations, report_every, progress, stops):
+    # One GA run in a pool process. Every report_every generations the best fitness goes
+    # to the progress queue and the run stops if the scheduler flagged it in stops
+    params = dict(params)
+    run = {name: params.pop(name, default) for name, default in RUN_PARAMS.items()}
+    maze = get_maze(run["maze_size"], run["maze_size"])
+
+    def fitness(ga_instance, solutions, solution_indices):
+        return batch_fitness_values(evaluate_population(solutions, maze))
+
+    def on_generation(ga_instance):
+        if ga_instance.generations_completed % report_every:
+            return None
+        fitness_values = ga_instance.last_generation_fitness
+        best = fitness_values[fitness_order(fitness_values)[0]]
+        progress.put((trial, ga_instance.generations_completed, np.ravel(best).tolist()))
+        if stops.get(trial):
+            return "stop"
+        return None
+
+    start = time.perf_counter()
+    ga_instance = build_ga(evaluator = fitness, pop_size = run["pop_size"], seed = run["seed"], on_generation = on_generation,
+                           engine = run["engine"], config = dict(GA_CONFIG, num_generations = generations, **params),
+                           genome_length = 10 * run["maze_size"])
+    ga_instance.run()
+    fitness_values = ga_instance.last_generation_fitness
+    best = np.ravel(fitness_values[fitness_order(fitness_values)[0]]).tolist()
+    return TrialResult(trial, None, ga_instance.generations_completed, best,
+                       ga_instance.generations_completed < generations, time.perf_counter() - start)
+
+
+class MedianStopper:
+    # Early stopping against the other trials at the same generation on the same problem
+    # (problem_of, the maze size): once past grace generations and with at least min_peers
+    # to compare with, a trial whose best is below the peers' quantile is stopped.
+    # quantile .5 is the classic median rule, the default .25 only stops runs in the bottom quarter
+
+    def __init__(self, quantile=.25, grace=100, min_peers=4):
+        self.quantile = quantile
+        self.grace = grace
+        self.min_peers = min_peers
+        self._history = defaultdict(list)  # (problem, generation) -> fitness keys reported there
+
+    def report(self, generation, key, problem=None):
+        # Records the report, True if the trial should stop
+        peers = self._history[problem, generation]
+        stop = False
+        if self.quantile > 0 and generation >= self.grace and len(peers) >= self.min_peers:
+            threshold = sorted(peers)[int(self.quantile * (len(peers) - 1))]
+            stop = key < threshold
+        peers.append(key)
+        return stop
+
+
+class ResultsTable:
+    # CSV with one row per finished trial, written and flushed as trials finish
+    def __init__(self, path, param_names):
+        self.path = path
+        self.columns = ["trial", *param_names, "generations", "smartness", "distance", "stopped", "seconds"]
+        self._file = open(path, "w", newline="")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(self.columns)
+
+    def write(self, result):
+        # best_fitness is maze_fitness's (smartness, -distance)
+        smartness, negative_distance = result.best_fitness
+        self._writer.writerow([result.trial, *(result.params.get(name) for name in self.columns[1:-5]),
+                               result.generations, smartness, -negative_distance, int(result.stopped), round(result.seconds, 3)])
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def print_progress(trial, generation, best, stopped):
+    print(f"trial {trial:>4} gen {generation:>6} best {best}" + ("  stopped" if stopped else ""), flush=True)
+
+
+async def run_experiments(configs, generations=1000, workers=None, report_every=50, stopper=None,
+                          results_path=None, on_progress=print_progress):
+    # Runs every configuration, at most `workers` at a time, and returns TrialResults grouped
+    # by problem_of, best first within each. Progress reports stream in from the workers
+    # while they run and feed the stopper
+    workers = workers or os.cpu_count() or 1
+    stopper = MedianStopper() if stopper is None else stopper
+    param_names = list(dict.fromkeys(name for config in configs for name in config))
+    table = ResultsTable(results_path, param_names) if results_path else None
+    loop = asyncio.get_running_loop()
+    results = []
+
+    with multiprocessing.Manager() as manager, ProcessPoolExecutor(workers) as pool:
+        progress, stops = manager.Queue(), manager.dict()
+
+        async def watch():
+            # The queue get blocks, so it waits in a thread and the loop stays free
+            while True:
+                item = await asyncio.to_thread(progress.get)
+                if item is None:
+                    return
+                trial, generation, best = item
+                stop = stopper.report(generation, fitness_key(best), problem_of(configs[trial]))
+                if stop:
+                    stops[trial] = True
+                if on_progress is not None:
+                    on_progress(trial, generation, best, stop)
+
+        watcher = asyncio.create_task(watch())
+        futures = [loop.run_in_executor(pool, run_trial, trial, config, generations, report_every, progress, stops)
+                   for trial, config in enumerate(configs)]
+        try:
+            for future in asyncio.as_completed(futures):
+                result = await future
+                result = result._replace(params=configs[result.trial])
+                results.append(result)
+                if table is not None:
+                    table.write(result)
+        finally:
+            progress.put(None)
+            await watcher
+            if table is not None:
+                table.close()
+
+    results.sort(key=lambda result: fitness_key(result.best_fitness), reverse=True)
+    return sorted(results, key=lambda result: problem_of(result.params))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--space", default=None, help='JSON file of parameter -> list of values, or {"range": [low, high]} for --random')
+    parser.add_argument("--random", type=int, default=None, help="sample this many configurations instead of the full grid")
+    parser.add_argument("--generations", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None, help="concurrent runs, default one per CPU")
+    parser.add_argument("--report-every", type=int, default=50, help="generations between progress reports and stop checks")
+    parser.add_argument("--grace", type=int, default=100, help="no trial is stopped before this generation")
+    parser.add_argument("--stop-quantile", type=float, default=.25, help="stop trials below this quantile of their peers, 0 never stops")
+    parser.add_argument("--out", default="experiments.csv", help="results table, one row per trial")
+    args = parser.parse_args()
+
+    space = DEFAULT_SPACE
+    if args.space:
+        with open(args.space) as f:
+            # JSON has no tuples, {"range": [low, high]} is random_search's (low, high)
+            space = {name: tuple(values["range"]) if isinstance(values, dict) else values
+                     for name, values in json.load(f).items()}
+    if args.random:
+        configs = random_search(space, args.random)
+    else:
+        configs = grid_search(space)
+
+    start = time.perf_counter()
+    results = asyncio.run(run_experiments(configs, args.generations, args.workers, args.report_every,
+                                          MedianStopper(args.stop_quantile, args.grace), args.out))
+    elapsed = time.perf_counter() - start
+    stopped = sum(result.stopped for result in results)
+    print(f"{len(results)} trials in {elapsed:.1f}s, {stopped} stopped early, results in {args.out}")
+    for problem, group in itertools.groupby(results, key=lambda result: problem_of(result.params)):
+        print(f"maze_size {problem}:")
+        for result in list(group)[:5]:
+            print(f"  {result.best_fitness}  {result.params}")
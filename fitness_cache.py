@@ -0,0 +1,114 @@
+import hashlib
+from collections import OrderedDict, namedtuple
+import numpy as np
+from move_codec import NUMPAD, encode_genes
+from batch_fitness import evaluate_population, batch_fitness_values
+
+"""Memo of fitness values keyed by a hash of the genome bytes plus the maze it ran in"""
+
+DEFAULT_CACHE_SIZE = 100_000
+# 16-byte blake2b digests, collisions are not a practical concern at GA population sizes
+DIGEST_SIZE = 16
+
+CacheInfo = namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])
+
+
+def maze_identity(maze):
+    return (maze.rows, maze.cols, maze.seed, maze.goal_policy, maze.algorithm)
+
+
+def genome_keys(genomes, maze, alphabet=NUMPAD):
+    # One key per genome. Genes are hashed as direction codes, so 8/2/4/6 and the
+    # same moves in another dtype or alphabet share an entry
+    codes = encode_genes(np.atleast_2d(genomes), alphabet)
+    identity = maze_identity(maze)
+    return [(identity, hashlib.blake2b(row.tobytes(), digest_size=DIGEST_SIZE).digest()) for row in codes]
+
+
+class FitnessCache:
+    # Bounded LRU of fitness values, any value works, including maze_fitness's
+    # (smartness, -distance) tuples
+
+    def __init__(self, maxsize=DEFAULT_CACHE_SIZE):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        value = self._entries.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def info(self):
+        return CacheInfo(self.hits, self.misses, self.evictions, self.maxsize, len(self._entries))
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+def evaluate_cached(population, maze, cache, evaluate=None, alphabet=NUMPAD):
+    # n x 2 fitness array for population, only the genomes the cache hasn't seen get
+    # evaluated (in one batch). evaluate(genomes) -> n x 2 defaults to evaluate_population
+    population = np.asarray(population)
+    keys = genome_keys(population, maze, alphabet)
+    values = [cache.get(key) for key in keys]
+
+    missing = [i for i, value in enumerate(values) if value is None]
+    if missing:
+        if evaluate is None:
+            fresh = batch_fitness_values(evaluate_population(population[missing], maze, alphabet=alphabet))
+        else:
+            fresh = np.asarray(evaluate(population[missing]))
+        for i, value in zip(missing, fresh):
+            value = tuple(value.tolist())
+            cache.put(keys[i], value)
+            values[i] = value
+    return np.array(values)
+
+
+class CachedFitness:
+    # Batched pygad fitness_func backed by a FitnessCache, e.g.
+    #   build_ga(evaluator = CachedFitness(get_maze(20, 20)))
+    # and CachedFitness.cache.info() after ga_instance.run()
+
+    def __init__(self, maze, cache=None, evaluate=None, alphabet=NUMPAD):
+        self.maze = maze
+        self.cache = FitnessCache() if cache is None else cache
+        self.evaluate = evaluate
+        self.alphabet = alphabet
+
+    def __call__(self, ga_instance, solutions, solution_indices):
+        return evaluate_cached(solutions, self.maze, self.cache, self.evaluate, self.alphabet)
+
+
+def memoize_fitness(fitness_func, maze, cache=None, alphabet=NUMPAD):
+    # Same idea for a scalar fitness_func(ga_instance, solution, solution_idx) like maze_fitness
+    cache = FitnessCache() if cache is None else cache
+
+    def cached_fitness_func(ga_instance, solution, solution_idx):
+        key = genome_keys(solution, maze, alphabet)[0]
+        value = cache.get(key)
+        if value is None:
+            value = fitness_func(ga_instance, solution, solution_idx)
+            cache.put(key, value)
+        return value
+
+    cached_fitness_func.cache = cache
+    return cached_fitness_func
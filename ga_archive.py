@@ -0,0 +1,290 @@
+import os
+import json
+import queue
+import threading
+import numpy as np
+from move_codec import NO_MOVE, NUMPAD, encode_genes, decode_genes
+from population import GENES_PER_BYTE, Population
+from selection import fitness_order
+
+"""Append-only, memory-mapped history of every generation's genomes and fitness, readable one generation at a time"""
+
+# One directory per run:
+#   meta.json     genome length, fitness dtype and shape per individual, written once
+#   genomes.bin   each archived generation's population, 2-bit packed like Population.pack
+#   fitness.bin   each archived generation's fitness rows
+#   index.bin     int64 rows of (generation, individuals, genome byte offset, fitness byte offset)
+# A generation is written to the data files first and indexed last, so a crash mid-append
+# leaves bytes past the index that the next writer truncates and readers never see
+META_FILE, GENOMES_FILE, FITNESS_FILE, INDEX_FILE = "meta.json", "genomes.bin", "fitness.bin", "index.bin"
+INDEX_COLUMNS = 4
+# Generations handed to the writer thread but not on disk yet, the GA waits past this
+DEFAULT_QUEUE_SIZE = 4
+
+
+class GenerationArchive:
+    # mode "r" opens an existing archive read-only, "a" appends (creating the directory).
+    # Reads are views into np.memmap's of the data files, so looking at generation 900
+    # of a 10^6 x 1000 run touches that generation's pages and nothing else
+
+    def __init__(self, directory, mode="a"):
+        if mode not in ("r", "a"):
+            raise ValueError(f"mode must be 'r' or 'a', got {mode!r}")
+        self.directory = directory
+        self.mode = mode
+        self.meta = None
+        self._maps = {}
+        meta_path = os.path.join(directory, META_FILE)
+        if os.path.exists(meta_path):
+            with open(meta_path) as f:
+                self.meta = json.load(f)
+        elif mode == "r":
+            raise FileNotFoundError(f"no archive in {directory!r}")
+        else:
+            os.makedirs(directory, exist_ok=True)
+        self._index = self._read_index()
+        if mode == "a":
+            self._truncate_unindexed()
+
+    def _path(self, name):
+        return os.path.join(self.directory, name)
+
+    def _read_index(self):
+        path = self._path(INDEX_FILE)
+        if not os.path.exists(path):
+            return np.empty((0, INDEX_COLUMNS), dtype=np.int64)
+        index = np.fromfile(path, dtype=np.int64)
+        # A torn last row from a crash is dropped
+        return index[:len(index) // INDEX_COLUMNS * INDEX_COLUMNS].reshape(-1, INDEX_COLUMNS)
+
+    def _truncate_unindexed(self):
+        # Cut the data files back to the end of the last indexed generation
+        self._maps.clear()
+        ends = {GENOMES_FILE: 0, FITNESS_FILE: 0}
+        if len(self._index):
+            _, individuals, genome_offset, fitness_offset = self._index[-1].tolist()
+            ends = {GENOMES_FILE: genome_offset + individuals * self.packed_width,
+                    FITNESS_FILE: fitness_offset + individuals * self.fitness_row_bytes}
+        for name, end in ends.items():
+            path = self._path(name)
+            if os.path.exists(path) and os.path.getsize(path) > end:
+                os.truncate(path, end)
+        index_path = self._path(INDEX_FILE)
+        if os.path.exists(index_path):
+            os.truncate(index_path, self._index.nbytes)
+
+    @property
+    def genome_length(self):
+        return self.meta["genome_length"]
+
+    @property
+    def packed_width(self):
+        # Bytes per packed genome
+        return -(-self.genome_length // GENES_PER_BYTE)
+
+    @property
+    def fitness_shape(self):
+        return tuple(self.meta["fitness_shape"])
+
+    @property
+    def fitness_row_bytes(self):
+        return int(np.prod(self.fitness_shape, dtype=np.int64)) * np.dtype(self.meta["fitness_dtype"]).itemsize
+
+    def __len__(self):
+        return len(self._index)
+
+    @property
+    def generations(self):
+        return self._index[:, 0].copy()
+
+    def append(self, generation, codes, fitness):
+        # codes: individuals x genes direction codes (move_codec), fitness: one row per individual.
+        # Synchronous, ArchiveRecorder does the same from a background thread
+        codes = np.asarray(codes, dtype=np.uint8)
+        fitness = np.asarray(fitness)
+        if self.mode != "a":
+            raise ValueError("archive is open read-only")
+        if self.meta is None:
+            self.meta = {"genome_length": codes.shape[1], "fitness_dtype": fitness.dtype.str,
+                         "fitness_shape": list(fitness.shape[1:])}
+            with open(self._path(META_FILE), "w") as f:
+                json.dump(self.meta, f)
+        if codes.shape[1] != self.genome_length or fitness.shape[1:] != self.fitness_shape or len(fitness) != len(codes):
+            raise ValueError(f"generation {generation} doesn't match the archive: genomes {codes.shape}, fitness {fitness.shape}")
+        if len(self._index) and generation <= self._index[-1, 0]:
+            raise ValueError(f"generation {generation} is not after the last archived one, {self._index[-1, 0]}")
+
+        packed = Population(codes).pack()
+        rows = np.ascontiguousarray(fitness, dtype=self.meta["fitness_dtype"])
+        offsets = []
+        for name, data in ((GENOMES_FILE, packed), (FITNESS_FILE, rows)):
+            with open(self._path(name), "ab") as f:
+                offsets.append(f.tell())
+                f.write(data.tobytes())
+        entry = np.array([[generation, len(codes), *offsets]], dtype=np.int64)
+        with open(self._path(INDEX_FILE), "ab") as f:
+            f.write(entry.tobytes())
+        self._index = np.concatenate([self._index, entry])
+
+    def truncate(self, generation):
+        # Drop every archived generation after `generation`, e.g. the ones a crashed run
+        # wrote past the checkpoint it resumes from
+        if self.mode != "a":
+            raise ValueError("archive is open read-only")
+        self._index = self._index[self._index[:, 0] <= generation]
+        self._truncate_unindexed()
+
+    def _map(self, name, end):
+        # Read-only memmap of a data file, remapped once the file outgrows the current map
+        mapped = self._maps.get(name)
+        if mapped is None or len(mapped) < end:
+            mapped = self._maps[name] = np.memmap(self._path(name), dtype=np.uint8, mode="r")
+        return mapped
+
+    def _entry(self, generation):
+        position = np.searchsorted(self._index[:, 0], generation)
+        if position == len(self._index) or self._index[position, 0] != generation:
+            raise KeyError(f"generation {generation} is not in the archive")
+        return self._index[position].tolist()
+
+    def packed(self, generation):
+        # individuals x packed_width uint8 view, no copy
+        _, individuals, offset, _ = self._entry(generation)
+        end = offset + individuals * self.packed_width
+        return self._map(GENOMES_FILE, end)[offset:end].reshape(individuals, self.packed_width)
+
+    def fitness(self, generation):
+        # Fitness rows as stored, a view, no copy
+        _, individuals, _, offset = self._entry(generation)
+        end = offset + individuals * self.fitness_row_bytes
+        return self._map(FITNESS_FILE, end)[offset:end].view(self.meta["fitness_dtype"]).reshape(individuals, *self.fitness_shape)
+
+    def codes(self, generation, rows=None):
+        # Direction codes of the selected individuals (all by default), only those get unpacked
+        packed = self.packed(generation)
+        selected = packed if rows is None else packed[rows]
+        return Population.unpack(np.atleast_2d(selected), self.genome_length).genes
+
+    def genomes(self, generation, rows=None, alphabet=NUMPAD):
+        return decode_genes(self.codes(generation, rows), alphabet)
+
+    def best(self, generation, alphabet=NUMPAD):
+        # (row, genome, fitness) of the generation's best individual, ranked like selection.fitness_order
+        fitness = self.fitness(generation)
+        row = int(fitness_order(fitness)[0])
+        return row, self.genomes(generation, [row], alphabet)[0], np.array(fitness[row])
+
+    def close(self):
+        self._maps.clear()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveRecorder:
+    # pygad on_generation callback archiving every `every` generations. The population is
+    # encoded on the GA thread (it's about to change), packing and disk writes happen on a
+    # background thread so the generation loop only waits when the writer is
+    # queue_size generations behind. start() before run() archives generation 0
+
+    def __init__(self, archive, every=1, on_generation=None, queue_size=DEFAULT_QUEUE_SIZE):
+        self.archive = archive
+        self.every = every
+        # Chained callback, e.g. pygad_test.on_gen, its return value ("stop") is passed on
+        self.on_generation = on_generation
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._error = None
+        self._initial_codes = None  # generation 0, set by start() until the first on_generation
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                self.archive.append(*item)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def _codes(self, ga_instance):
+        # ga_engine.GAEngine already holds codes, pygad holds gene values
+        codes = getattr(ga_instance, "codes", None)
+        codes = np.array(codes) if codes is not None else encode_genes(np.asarray(ga_instance.population), NUMPAD)
+        if (codes == NO_MOVE).any():
+            raise ValueError("only 8/2/4/6 genomes can be archived")
+        return codes
+
+    def start(self, ga_instance):
+        # Call before run(), once the GA is at the generation it starts from. A fresh run
+        # archives its initial population as generation 0 and needs an empty archive, a run
+        # resumed from a checkpoint drops whatever was archived after that generation.
+        # Generation 0's fitness isn't known yet, it's archived on the first on_generation
+        # from previous_generation_fitness, what run() computed for it, so nothing is evaluated twice
+        generation = ga_instance.generations_completed
+        if generation == 0:
+            if len(self.archive):
+                raise ValueError(f"{self.archive.directory!r} already archives a run, use an empty directory "
+                                 "or resume that run from its checkpoint")
+            self._initial_codes = self._codes(ga_instance)
+        else:
+            self.archive.truncate(generation)
+
+    def _put(self, generation, codes, fitness):
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+        self._queue.put((generation, codes, np.array(fitness)))
+
+    def record(self, ga_instance):
+        self._put(ga_instance.generations_completed, self._codes(ga_instance), ga_instance.last_generation_fitness)
+
+    def flush(self):
+        # Block until every queued generation is on disk
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __call__(self, ga_instance):
+        if self._initial_codes is not None:
+            self._put(0, self._initial_codes, ga_instance.previous_generation_fitness)
+            self._initial_codes = None
+        if ga_instance.generations_completed % self.every == 0:
+            self.record(ga_instance)
+        if self.on_generation is not None:
+            return self.on_generation(ga_instance)
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser()
+    parser.add_argument("directory")
+    parser.add_argument("--generation", type=int, default=None, help="replay this generation's best runner, default the last one")
+    parser.add_argument("--replay", default=None, help="save the replay as a .gif or .npy instead of printing it")
+    args = parser.parse_args()
+
+    with GenerationArchive(args.directory, mode="r") as archive:
+        if not len(archive):
+            raise SystemExit(f"{args.directory} has no generations yet")
+        print(f"{len(archive)} generations, {archive.generations[0]}..{archive.generations[-1]}, genome length {archive.genome_length}")
+        generation = archive.generations[-1] if args.generation is None else args.generation
+        row, genome, fitness = archive.best(generation)
+        print(f"Generation {generation}: best is individual {row}, fitness {fitness}")
+        # Imported here, pygad_test itself imports this module
+        from pygad_test import show_maze_progression
+        show_maze_progression(list(genome), args.replay)
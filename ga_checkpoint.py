@@ -0,0 +1,155 @@
+import os
+import glob
+import queue
+import threading
+import numpy as np
+from population import Population
+from move_codec import NO_MOVE, NUMPAD
+
+"""Periodic GA checkpoints to .npz, written off the generation loop, and resume to the exact same trajectory"""
+
+# gen_000120.npz, zero padded so a plain sort is generation order
+CHECKPOINT_PATTERN = "gen_{generation:06d}.npz"
+
+
+def capture_state(ga_instance):
+    # Everything the next generation depends on, copied so the GA can keep going:
+    # population, its fitness, the generation counter and both of pygad's RNGs
+    population = np.asarray(ga_instance.population)
+    state = {
+        "generations_completed": np.int64(ga_instance.generations_completed),
+        "fitness": np.array(ga_instance.last_generation_fitness),
+        "best_solutions_fitness": np.array(ga_instance.best_solutions_fitness),
+        "population_dtype": np.array(population.dtype.str),
+    }
+    # 8/2/4/6 genomes pack to 2 bits a gene, anything else is stored as is
+    packed = Population.from_genes(population, NUMPAD)
+    if (packed.genes < NO_MOVE).all() and np.array_equal(packed.to_genes(NUMPAD), population):
+        state["population_packed"] = packed.pack()
+        state["genome_length"] = np.int64(packed.genome_length)
+    else:
+        state["population"] = population.copy()
+
+    # RandomState: ('MT19937', keys, pos, has_gauss, cached_gaussian)
+    _, keys, pos, has_gauss, cached_gaussian = ga_instance.numpy_random_generator.get_state()
+    state["numpy_rng_keys"] = keys.copy()
+    state["numpy_rng_extra"] = np.array([pos, has_gauss, cached_gaussian], dtype=np.float64)
+    # random.Random: (version, 625 ints, gauss_next)
+    version, internal, gauss_next = ga_instance.python_random_generator.getstate()
+    state["python_rng_internal"] = np.array(internal, dtype=np.uint32)
+    state["python_rng_extra"] = np.array([version, np.nan if gauss_next is None else gauss_next], dtype=np.float64)
+    return state
+
+
+def restore_state(ga_instance, state):
+    # Inverse of capture_state, the next run() carries on from that generation
+    if "population_packed" in state:
+        genes = Population.unpack(state["population_packed"], int(state["genome_length"])).to_genes(NUMPAD)
+        population = genes.astype(str(state["population_dtype"]))
+    else:
+        population = np.array(state["population"])
+    ga_instance.population = population
+    ga_instance.generations_completed = int(state["generations_completed"])
+    ga_instance.last_generation_fitness = np.array(state["fitness"])
+    ga_instance.best_solutions_fitness = list(np.array(state["best_solutions_fitness"]))
+
+    pos, has_gauss, cached_gaussian = state["numpy_rng_extra"]
+    ga_instance.numpy_random_generator.set_state(
+        ("MT19937", np.array(state["numpy_rng_keys"]), int(pos), int(has_gauss), float(cached_gaussian)))
+    version, gauss_next = state["python_rng_extra"]
+    ga_instance.python_random_generator.setstate(
+        (int(version), tuple(int(word) for word in state["python_rng_internal"]), None if np.isnan(gauss_next) else float(gauss_next)))
+
+
+def write_checkpoint(path, state):
+    # Written next to the target then renamed, so a crash mid-write never leaves a torn checkpoint
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **state)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path):
+    with np.load(path) as data:
+        return {name: data[name] for name in data.files}
+
+
+def latest_checkpoint(directory):
+    # Path of the newest checkpoint in directory, None if there isn't one
+    paths = sorted(glob.glob(os.path.join(directory, "gen_*.npz")))
+    return paths[-1] if paths else None
+
+
+def resume_ga(ga_instance, directory, num_generations):
+    # Load the newest checkpoint into a freshly built GA and shorten its run so the
+    # total stays num_generations. Returns the generation resumed from, None for a fresh start
+    path = latest_checkpoint(directory)
+    if path is None:
+        return None
+    restore_state(ga_instance, load_checkpoint(path))
+    ga_instance.num_generations = max(num_generations - ga_instance.generations_completed, 0)
+    return ga_instance.generations_completed
+
+
+class CheckpointWriter:
+    # pygad on_generation callback. Every `every` generations the state is copied on
+    # the GA thread (cheap) and handed to a background thread that does the disk
+    # write, so the generation loop never waits on I/O. Only the newest `keep` files stay
+
+    def __init__(self, directory, every=50, keep=3, on_generation=None):
+        self.directory = directory
+        self.every = every
+        self.keep = keep
+        # Chained callback, e.g. pygad_test.on_gen, its return value ("stop") is passed on
+        self.on_generation = on_generation
+        self.written = []
+        self._queue = queue.Queue()
+        self._thread = None
+        self._error = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _write_loop(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                path, state = item
+                write_checkpoint(path, state)
+                self.written.append(path)
+                for old in self.written[:-self.keep]:
+                    os.remove(old)
+                del self.written[:-self.keep]
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def save(self, ga_instance):
+        if self._error is not None:
+            raise self._error
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+        path = os.path.join(self.directory, CHECKPOINT_PATTERN.format(generation=ga_instance.generations_completed))
+        self._queue.put((path, capture_state(ga_instance)))
+
+    def flush(self):
+        # Block until every queued checkpoint is on disk
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+
+    def close(self):
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self._error is not None:
+            raise self._error
+
+    def __call__(self, ga_instance):
+        if ga_instance.generations_completed % self.every == 0:
+            self.save(ga_instance)
+        if self.on_generation is not None:
+            return self.on_generation(ga_instance)
@@ -0,0 +1,203 @@
+import numpy as np
+from move_codec import NUMPAD, encode_genes, decode_genes
+from rng_streams import RunStreams
+from selection import fitness_order, select
+
+"""Lean GA for 4-move genomes, every operator is a few NumPy calls over the uint8 population matrix"""
+
+# pygad parent_selection_type -> selection.select mode. Selection runs on ranks, so
+# "rws" (roulette) becomes rank-proportional stochastic universal sampling
+PARENT_SELECTION = {"sss": "truncation", "tournament": "tournament", "rws": "sus", "sus": "sus", "random": "random"}
+CROSSOVER_TYPES = ("scattered", "uniform", "single_point", "two_points", "k_points")
+MUTATION_TYPES = ("random",)
+
+# pygad.GA arguments that mean something here, anything else is rejected so a config never silently loses a setting
+SUPPORTED_ARGS = (
+    "fitness_func", "fitness_batch_size", "initial_population", "sol_per_pop", "num_genes", "gene_space", "gene_type",
+    "num_generations", "num_parents_mating", "parent_selection_type", "K_tournament", "keep_parents", "keep_elitism",
+    "crossover_type", "crossover_probability", "mutation_type", "mutation_percent_genes", "mutation_num_genes",
+    "mutation_probability", "random_seed", "on_generation", "suppress_warnings",
+    "crossover_points",  # not pygad's, number of cuts for crossover_type="k_points"
+)
+
+
+def gene_alphabet(gene_space):
+    # Gene value -> direction code, the 8/2/4/6 numpad when that's what gene_space holds
+    values = list(gene_space)
+    if len(values) != 4 or len(set(values)) != 4:
+        raise ValueError(f"gene_space must hold 4 distinct moves, got {gene_space!r}")
+    if set(values) == set(NUMPAD):
+        return NUMPAD
+    return {value: code for code, value in enumerate(values)}
+
+
+class GAEngine:
+    # Drop-in for the pygad.GA calls in this repo: same constructor arguments
+    # (GA_CONFIG carries over), run(), best_solution(), population,
+    # last_generation_fitness, previous_generation_fitness, generations_completed, best_solutions_fitness and
+    # on_generation returning "stop". fitness_func gets the decoded genes like pygad's.
+    # Differences: multi-objective fitness is ranked with selection.fitness_order instead of
+    # NSGA-II, and crossover_probability is applied per offspring.
+    # random_seed can also be a rng_streams.RunStreams: selection (and a random initial
+    # population) draw from its "ga" stream, crossover and mutation from their own streams
+
+    def __init__(self, **config):
+        unknown = set(config) - set(SUPPORTED_ARGS)
+        if unknown:
+            raise TypeError(f"unsupported GA arguments {sorted(unknown)}, supported: {SUPPORTED_ARGS}")
+        self.fitness_func = config["fitness_func"]
+        self.fitness_batch_size = config.get("fitness_batch_size")
+        self.alphabet = gene_alphabet(config.get("gene_space", (4, 8, 6, 2)))
+        self.num_generations = config["num_generations"]
+        self.num_parents_mating = config["num_parents_mating"]
+        self.parent_selection_type = config.get("parent_selection_type", "sss")
+        self.K_tournament = config.get("K_tournament", 3)
+        self.keep_parents = config.get("keep_parents", -1)
+        self.keep_elitism = config.get("keep_elitism", 1)
+        self.crossover_type = config.get("crossover_type", "single_point")
+        self.crossover_points = {"single_point": 1, "two_points": 2}.get(self.crossover_type, config.get("crossover_points", 3))
+        self.crossover_probability = config.get("crossover_probability")
+        self.mutation_type = config.get("mutation_type", "random")
+        self.mutation_probability = config.get("mutation_probability")
+        self.on_generation = config.get("on_generation")
+        streams = config.get("random_seed")
+        streams = streams if isinstance(streams, RunStreams) else RunStreams(streams)
+        self.rng = streams.generator("ga")
+        self.crossover_rng = streams.generator("crossover")
+        self.mutation_rng = streams.generator("mutation")
+
+        if self.parent_selection_type not in PARENT_SELECTION:
+            raise ValueError(f"parent_selection_type must be one of {tuple(PARENT_SELECTION)}, got {self.parent_selection_type!r}")
+        if self.crossover_type not in CROSSOVER_TYPES:
+            raise ValueError(f"crossover_type must be one of {CROSSOVER_TYPES}, got {self.crossover_type!r}")
+        if self.mutation_type not in MUTATION_TYPES:
+            raise ValueError(f"mutation_type must be one of {MUTATION_TYPES}, got {self.mutation_type!r}")
+
+        if config.get("initial_population") is not None:
+            self.codes = encode_genes(np.asarray(config["initial_population"]), self.alphabet)
+        else:
+            self.codes = self.rng.integers(0, 4, size=(config["sol_per_pop"], config["num_genes"]), dtype=np.uint8)
+        pop_size, genes = self.codes.shape
+        if "mutation_num_genes" in config:
+            self.mutation_num_genes = config["mutation_num_genes"]
+        else:
+            self.mutation_num_genes = max(1, round(genes * config.get("mutation_percent_genes", 10) / 100))
+
+        # Survivors carried over unchanged (with their fitness), the rest of the population is offspring
+        if self.keep_elitism > 0:
+            self.num_kept = self.keep_elitism
+        elif self.keep_parents == -1:
+            self.num_kept = self.num_parents_mating
+        else:
+            self.num_kept = self.keep_parents
+        if not 0 <= self.num_kept < pop_size:
+            raise ValueError(f"keeping {self.num_kept} survivors leaves no room for offspring in a population of {pop_size}")
+
+        self.generations_completed = 0
+        self.last_generation_fitness = None
+        self.previous_generation_fitness = None
+        self.best_solutions_fitness = []
+        # Double buffer, the next generation is written into the spare matrix
+        self._spare = np.empty_like(self.codes)
+
+    @property
+    def population(self):
+        # Gene values, like pygad.GA.population
+        return decode_genes(self.codes, self.alphabet)
+
+    def evaluate(self, codes, indices):
+        # Batched like pygad: one call per fitness_batch_size solutions, one per solution when it's None
+        genes = decode_genes(codes, self.alphabet)
+        if self.fitness_batch_size in (None, 1):
+            return np.array([self.fitness_func(self, genome, i) for genome, i in zip(genes, indices)])
+        batches = [self.fitness_func(self, genes[start:start + self.fitness_batch_size], indices[start:start + self.fitness_batch_size])
+                   for start in range(0, len(genes), self.fitness_batch_size)]
+        return np.concatenate([np.asarray(batch) for batch in batches])
+
+    def cal_pop_fitness(self):
+        # Fitness of the current population, like pygad's
+        return self.evaluate(self.codes, np.arange(len(self.codes)))
+
+    def select_parents(self, order):
+        if self.parent_selection_type == "random":
+            return self.rng.integers(0, len(order), self.num_parents_mating)
+        if self.parent_selection_type == "sss":
+            return order[:self.num_parents_mating]
+        # Rank scores, the best individual scores highest
+        scores = np.empty(len(order))
+        scores[order] = -np.arange(len(order))
+        mode = PARENT_SELECTION[self.parent_selection_type]
+        kwargs = {"tournament_size": self.K_tournament} if mode == "tournament" else {}
+        return select(scores, self.num_parents_mating, mode, self.rng, **kwargs)
+
+    def crossover(self, parents, out):
+        # Offspring k mates parent k and parent k + 1 (wrapping), as pygad pairs them
+        rng = self.crossover_rng
+        n, genes = out.shape
+        first = parents[np.arange(n) % len(parents)]
+        second = parents[(np.arange(n) + 1) % len(parents)]
+        if self.crossover_type in ("scattered", "uniform"):
+            take_second = rng.random((n, genes)) < 0.5
+        else:
+            # Each cut point flips which parent genes come from, a running parity gives the mask
+            points = rng.integers(1, genes, size=(n, self.crossover_points))
+            flips = np.zeros((n, genes + 1), dtype=np.int8)
+            np.add.at(flips, (np.arange(n)[:, None], points), 1)
+            take_second = (np.cumsum(flips[:, :genes], axis=1) & 1).astype(bool)
+        if self.crossover_probability is not None:
+            # Offspring that skip crossover are copies of their first parent
+            take_second &= (rng.random(n) <= self.crossover_probability)[:, None]
+        np.copyto(out, self.codes[first])
+        np.copyto(out, self.codes[second], where=take_second)
+
+    def mutate(self, offspring):
+        rng = self.mutation_rng
+        if self.mutation_probability is not None:
+            mask = rng.random(offspring.shape) < self.mutation_probability
+            offspring[mask] = rng.integers(0, 4, size=int(mask.sum()), dtype=np.uint8)
+            return
+        # mutation_num_genes random positions per offspring get a random move, like pygad's "random"
+        n, genes = offspring.shape
+        rows = np.repeat(np.arange(n), self.mutation_num_genes)
+        columns = rng.integers(0, genes, size=n * self.mutation_num_genes)
+        offspring[rows, columns] = rng.integers(0, 4, size=len(rows), dtype=np.uint8)
+
+    def best_solution(self, pop_fitness=None):
+        # (solution genes, fitness, index), like pygad's, from the stored fitness unless told otherwise
+        fitness = self.last_generation_fitness if pop_fitness is None else np.asarray(pop_fitness)
+        best = fitness_order(fitness)[0]
+        return self.population[best], fitness[best], best
+
+    def run(self):
+        if self.last_generation_fitness is None:
+            self.last_generation_fitness = self.cal_pop_fitness()
+        num_kept = self.num_kept
+
+        for _ in range(self.num_generations):
+            fitness = self.last_generation_fitness
+            order = fitness_order(fitness)
+            self.best_solutions_fitness.append(fitness[order[0]])
+
+            parents = self.select_parents(order)
+            kept = order[:num_kept] if self.keep_elitism > 0 else parents[:num_kept]
+            next_codes = self._spare
+            next_codes[:num_kept] = self.codes[kept]
+            offspring = next_codes[num_kept:]
+            self.crossover(parents, offspring)
+            self.mutate(offspring)
+
+            next_fitness = np.empty_like(fitness)
+            next_fitness[:num_kept] = fitness[kept]
+            next_fitness[num_kept:] = self.evaluate(offspring, np.arange(num_kept, len(next_codes)))
+
+            self._spare, self.codes = self.codes, next_codes
+            self.previous_generation_fitness, self.last_generation_fitness = fitness, next_fitness
+            self.generations_completed += 1
+
+            if self.on_generation is not None:
+                result = self.on_generation(self)
+                if isinstance(result, str) and result.lower() == "stop":
+                    break
+
+        self.best_solutions_fitness.append(self.best_solution()[1])
+        return self
@@ -0,0 +1,269 @@
+import csv
+import json
+import os
+import queue
+import threading
+import time
+import numpy as np
+from move_codec import NUMPAD, encode_genes
+
+"""Per-generation GA metrics from the fitness pygad already computed, buffered and written off the generation loop"""
+
+# Spread of each objective per generation, on top of best and mean
+QUANTILES = (0.25, 0.5, 0.75)
+# Records held in memory, a batch of flush_every goes to the writer thread at a time
+DEFAULT_CAPACITY = 256
+DEFAULT_FLUSH_EVERY = 64
+
+
+def fitness_stats(fitness, objective_names=("smartness", "distance")):
+    # Dict of best / mean / q25 / q50 / q75 per objective. fitness is pygad's
+    # last_generation_fitness, n values or n x objectives
+    fitness = np.asarray(fitness, dtype=np.float64)
+    if fitness.ndim == 1:
+        fitness, objective_names = fitness[:, None], ("fitness",)
+    stats = {}
+    quantiles = np.quantile(fitness, QUANTILES, axis=0)
+    for j, name in enumerate(objective_names):
+        stats[f"best_{name}"] = fitness[:, j].max()
+        stats[f"mean_{name}"] = fitness[:, j].mean()
+        for q, values in zip(QUANTILES, quantiles):
+            stats[f"q{round(q * 100)}_{name}"] = values[j]
+    return stats
+
+
+def diversity_stats(population, alphabet=NUMPAD):
+    # unique_fraction: distinct genomes / population size.
+    # gene_entropy: mean over positions of the entropy of the move distribution, 0 to 2 bits
+    codes = encode_genes(np.asarray(population), alphabet)
+    n = len(codes)
+    unique = len({row.tobytes() for row in codes})
+    counts = np.stack([(codes == code).sum(axis=0) for code in range(4)])
+    p = counts / n
+    with np.errstate(divide="ignore", invalid="ignore"):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=0)
+    return {"unique_fraction": unique / n, "gene_entropy": entropy.mean()}
+
+
+def _has_data(path):
+    return os.path.exists(path) and os.path.getsize(path) > 0
+
+
+# Sinks open their file on the first write. With append=True they add to what's already
+# there instead of starting over. resume(generation) is for a run picked up from a
+# checkpoint: rows the crashed run wrote past that generation are dropped, then it appends
+
+class CSVSink:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self._file = None
+        self._writer = None
+
+    def write(self, records):
+        if self._file is None:
+            # The header only goes into a new or empty file
+            header = not (self.append and _has_data(self.path))
+            self._file = open(self.path, "a" if self.append else "w", newline="")
+            self._writer = csv.writer(self._file)
+            if header:
+                self._writer.writerow(records.dtype.names)
+        self._writer.writerows(records.tolist())
+        self._file.flush()
+
+    def resume(self, generation):
+        if _has_data(self.path):
+            with open(self.path, newline="") as f:
+                rows = list(csv.reader(f))
+            column = rows[0].index("generation")
+            # A row torn by the crash doesn't parse and goes too
+            kept = [row for row in rows[1:] if len(row) == len(rows[0]) and row[column].isdigit() and int(row[column]) <= generation]
+            with open(self.path, "w", newline="") as f:
+                csv.writer(f).writerows([rows[0]] + kept)
+        self.append = True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class JSONLinesSink:
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self._file = None
+
+    def write(self, records):
+        if self._file is None:
+            self._file = open(self.path, "a" if self.append else "w")
+        names = records.dtype.names
+        self._file.writelines(json.dumps(dict(zip(names, row))) + "\n" for row in records.tolist())
+        self._file.flush()
+
+    def resume(self, generation):
+        if _has_data(self.path):
+            kept = []
+            with open(self.path) as f:
+                for line in f:
+                    try:
+                        if json.loads(line)["generation"] <= generation:
+                            kept.append(line if line.endswith("\n") else line + "\n")
+                    except (ValueError, KeyError):
+                        pass  # torn by the crash
+            with open(self.path, "w") as f:
+                f.writelines(kept)
+        self.append = True
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class ParquetSink:
+    # One row group per flushed batch, needs pyarrow. A parquet file can't be reopened
+    # for writing, so it can't be appended to
+    def __init__(self, path, append=False):
+        self.path = path
+        self.append = append
+        self._writer = None
+
+    def resume(self, generation):
+        if _has_data(self.path):
+            raise ValueError(f"can't append to parquet file {self.path!r}, use .csv or .jsonl metrics to resume runs")
+        self.append = True
+
+    def write(self, records):
+        import pyarrow
+        import pyarrow.parquet
+        if self._writer is None and self.append and _has_data(self.path):
+            raise ValueError(f"can't append to parquet file {self.path!r}, use .csv or .jsonl metrics to resume runs")
+        table = pyarrow.table({name: records[name] for name in records.dtype.names})
+        if self._writer is None:
+            self._writer = pyarrow.parquet.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+
+SINKS = {".csv": CSVSink, ".jsonl": JSONLinesSink, ".parquet": ParquetSink}
+
+
+def open_sink(path, append=False):
+    # Sink picked by file extension
+    extension = os.path.splitext(path)[1]
+    if extension not in SINKS:
+        raise ValueError(f"metrics file must end in one of {tuple(SINKS)}, got {path!r}")
+    return SINKS[extension](path, append)
+
+
+class MetricsRecorder:
+    # pygad on_generation callback. Each generation becomes one row of a
+    # preallocated structured array used as a ring buffer; every flush_every rows
+    # are copied out and written by a background thread, so the GA only pays for
+    # the stats themselves. Wrap the fitness function with timed() to get eval_seconds, e.g.
+    #   recorder = MetricsRecorder(open_sink("metrics.csv"))
+    #   build_ga(evaluator = recorder.timed(evaluator), on_generation = recorder)
+
+    def __init__(self, sink=None, capacity=DEFAULT_CAPACITY, flush_every=DEFAULT_FLUSH_EVERY,
+                 objective_names=("smartness", "distance"), diversity=True, on_generation=None):
+        if not 0 < flush_every <= capacity:
+            raise ValueError(f"flush_every must be in 1..capacity ({capacity}), got {flush_every}")
+        self.sink = sink
+        self.capacity = capacity
+        self.flush_every = flush_every
+        self.objective_names = objective_names
+        self.diversity = diversity
+        # Chained callback, its return value ("stop") is passed on
+        self.on_generation = on_generation
+        self.buffer = None  # structured array, built on the first record once the fields are known
+        self.count = 0  # records ever made, record i lives at buffer[i % capacity]
+        self._flushed = 0
+        self._eval_seconds = 0.0
+        self._last_mark = None
+        self._queue = queue.Queue()
+        self._thread = None
+        self._error = None
+
+    def timed(self, fitness_func):
+        # Same fitness function, with the time spent in it added to this generation's eval_seconds
+        def timed_fitness(ga_instance, solutions, solution_indices):
+            start = time.perf_counter()
+            if self._last_mark is None:
+                self._last_mark = start
+            try:
+                return fitness_func(ga_instance, solutions, solution_indices)
+            finally:
+                self._eval_seconds += time.perf_counter() - start
+        return timed_fitness
+
+    def record(self, ga_instance):
+        now = time.perf_counter()
+        row = {"generation": ga_instance.generations_completed,
+               "generation_seconds": now - self._last_mark if self._last_mark is not None else np.nan,
+               "eval_seconds": self._eval_seconds}
+        row.update(fitness_stats(ga_instance.last_generation_fitness, self.objective_names))
+        if self.diversity:
+            row.update(diversity_stats(ga_instance.population))
+        self._last_mark, self._eval_seconds = now, 0.0
+
+        if self.buffer is None:
+            self.buffer = np.zeros(self.capacity, dtype=[(name, np.int64 if name == "generation" else np.float64) for name in row])
+        self.buffer[self.count % self.capacity] = tuple(row.values())
+        self.count += 1
+        if self.count - self._flushed >= self.flush_every:
+            self.flush(wait=False)
+
+    def recent(self, n=None):
+        # The last n records still in the buffer, oldest first
+        n = min(self.count, self.capacity) if n is None else min(n, self.count, self.capacity)
+        if self.buffer is None or n == 0:
+            return None
+        return self.buffer[np.arange(self.count - n, self.count) % self.capacity]
+
+    def _write_loop(self):
+        while True:
+            records = self._queue.get()
+            try:
+                if records is None:
+                    return
+                self.sink.write(records)
+            except Exception as error:
+                self._error = error
+            finally:
+                self._queue.task_done()
+
+    def flush(self, wait=True):
+        # Hand everything not yet written to the writer thread, wait=True blocks until it is on disk
+        if self._error is not None:
+            raise self._error
+        pending = self.count - self._flushed
+        if self.sink is None or pending == 0:
+            self._flushed = self.count
+            return
+        if pending > self.capacity:
+            raise RuntimeError(f"{pending - self.capacity} metrics records were overwritten before being flushed")
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._write_loop, daemon=True)
+            self._thread.start()
+        self._queue.put(self.recent(pending))
+        self._flushed = self.count
+        if wait:
+            self._queue.join()
+            if self._error is not None:
+                raise self._error
+
+    def close(self):
+        self.flush()
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join()
+            self._thread = None
+        if self.sink is not None:
+            self.sink.close()
+
+    def __call__(self, ga_instance):
+        self.record(ga_instance)
+        if self.on_generation is not None:
+            return self.on_generation(ga_instance)
@@ -0,0 +1,82 @@
+from collections import namedtuple
+import numpy as np
+from move_codec import NUMPAD, NO_MOVE, OPPOSITE, encode_genes
+from profiling import count, timed
+
+"""Reduce genomes to the moves that matter in a maze: wall bumps dropped, immediate reversals cancelled"""
+
+# Per genome, for one maze:
+#   paths      n x max_length uint8 direction codes of the effective moves, padded with NO_MOVE
+#   lengths    effective moves per genome
+#   wall_hits  genes that bumped into a wall (or weren't moves), before the goal with stop_at_goal
+#   goal_step  genes used when the goal was reached, -1 if never (only tracked with stop_at_goal)
+#   genes      raw genome length, the goal bonus counts the genes left after goal_step
+# Genomes with the same (path, wall_hits, goal_step) have the same maze_fitness
+CanonicalGenomes = namedtuple("CanonicalGenomes", ["paths", "lengths", "wall_hits", "goal_step", "genes"])
+
+
+@timed("walk.canonical")
+def canonicalize(population, maze, alphabet=NUMPAD, stop_at_goal=True):
+    # One vectorized walk of the population. Every move that gets through is pushed on the
+    # runner's move stack unless it undoes the move on top, which pops it instead: moves are
+    # reversible, so 8 then 2 lands back where it started whatever the maze looks like
+    population = np.asarray(population)
+    if population.ndim != 2:
+        raise ValueError(f"population must be 2-D (individuals x genes), got shape {population.shape}")
+    n, genes = population.shape
+    count("walk.genomes", n)
+    steps = np.ascontiguousarray(encode_genes(population, alphabet).T)
+
+    # Flat n x (genes + 1) stack, runner r's moves start at r * (genes + 1). The last
+    # column is never written, so the slot "before" an empty stack always reads NO_MOVE
+    width = genes + 1
+    stack = np.full(n * width, NO_MOVE, dtype=np.uint8)
+    next_cell, hits_wall, columns = maze.next_cell.ravel(), maze.hits_wall.ravel(), maze.next_cell.shape[1]
+    # The move each (cell, code) would undo, 255 when it's blocked so it never matches a stack top
+    undoes = np.where(maze.hits_wall, 255, OPPOSITE).astype(np.uint8).ravel()
+    lengths = np.zeros(n, dtype=np.intp)
+    wall_hits = np.zeros(n, dtype=np.int64)
+    goal_step = np.full(n, -1, dtype=np.int64)
+
+    # Runners still walking, finished ones are written back and dropped
+    active = np.arange(n)
+    a_cell = np.full(n, maze.start_cell, dtype=np.intp)
+    a_length, a_hits = lengths.copy(), wall_hits.copy()
+    for i in range(genes + 1):
+        if stop_at_goal:
+            arrived = a_cell == maze.goal_cell
+            if arrived.any():
+                done = active[arrived]
+                lengths[done], wall_hits[done], goal_step[done] = a_length[arrived], a_hits[arrived], i
+                keep = ~arrived
+                active, a_cell, a_length, a_hits = active[keep], a_cell[keep], a_length[keep], a_hits[keep]
+        if i == genes or len(active) == 0:
+            break
+        code = steps[i, active]
+        t = a_cell * columns + code
+        hit = hits_wall.take(t)
+        a_cell = next_cell.take(t)
+        a_hits += hit
+
+        # One write per runner: a pop clears the top slot, a push fills the slot above it,
+        # a wall hit writes NO_MOVE above the top, where it already is
+        top = active * width + a_length - 1
+        undo = stack.take(top) == undoes.take(t)
+        stack[top + 1 - undo] = np.where(hit | undo, NO_MOVE, code)
+        a_length += 1 - hit - 2 * undo
+    lengths[active], wall_hits[active] = a_length, a_hits
+
+    stack = stack.reshape(n, width)
+    return CanonicalGenomes(stack[:, :max(int(lengths.max(initial=0)), 1)], lengths, wall_hits, goal_step, genes)
+
+
+def duplicate_fraction(population, maze, alphabet=NUMPAD, stop_at_goal=True):
+    # Share of the population whose canonical form repeats another genome's, i.e. how much
+    # of it scores the same as someone else just through wall bumps and back-and-forth moves.
+    # Paths are NO_MOVE padded and a real move is never NO_MOVE, so equal rows are equal forms
+    canonical = canonicalize(population, maze, alphabet, stop_at_goal)
+    n = len(canonical.lengths)
+    if n == 0:
+        return 0.0
+    forms = np.column_stack((canonical.paths.astype(np.int64), canonical.wall_hits, canonical.goal_step))
+    return 1 - len(np.unique(forms, axis=0)) / n
@@ -0,0 +1,169 @@
+import numpy as np
+from move_codec import NUMPAD, encode_genes
+from batch_fitness import BatchResult, batch_fitness_values
+from profiling import count, timed
+
+"""Re-evaluate children by resuming the walk from the last checkpoint they share with an earlier genome"""
+
+DEFAULT_CHECKPOINT_EVERY = 20
+# Genomes whose checkpoints are kept around, each is one genome plus three ints per checkpoint
+DEFAULT_MAX_ROWS = 100_000
+
+
+class IncrementalEvaluator:
+    # Every evaluated genome leaves its walk state (cell, smartness, moves) every
+    # checkpoint_every genes in per-row state arrays. A child is matched to the remembered
+    # genome it shares the longest prefix with, its parent most of all, and picks up from
+    # the last checkpoint inside that prefix. Remembered genomes are kept sorted, so the
+    # longest shared prefix is always with one of the two rows a child sorts between and
+    # the whole match is a searchsorted plus one comparison per candidate.
+    # Results are identical to batch_fitness.evaluate_population.
+
+    def __init__(self, maze, checkpoint_every=DEFAULT_CHECKPOINT_EVERY, goal_bonus=100, stop_at_goal=True,
+                 alphabet=NUMPAD, max_rows=DEFAULT_MAX_ROWS):
+        self.maze = maze
+        self.checkpoint_every = checkpoint_every
+        self.goal_bonus = goal_bonus
+        self.stop_at_goal = stop_at_goal
+        self.alphabet = alphabet
+        self.max_rows = max_rows
+        # Remembered genomes sorted by their direction codes viewed as one fixed-width bytes
+        # key per row (bytes order is the genomes' lexicographic order), and their
+        # rows x checkpoints state arrays
+        self._keys = None
+        self._codes = None
+        self._cells = self._smartness = self._moves = None
+        self.genes_total = 0
+        self.genes_walked = 0
+
+    def _boundaries(self, genes):
+        # Gene indices a walk state is saved at, the full genome length included
+        return np.array(list(range(self.checkpoint_every, genes, self.checkpoint_every)) + [genes])
+
+    def _keys_of(self, codes):
+        return np.ascontiguousarray(codes).view(f"S{codes.shape[1]}").ravel()
+
+    def _resume_points(self, codes, keys, boundaries):
+        # For every genome, the remembered row it resumes from (-1 for none), the checkpoint
+        # index there and the state at that checkpoint
+        n, genes = codes.shape
+        source = np.full(n, -1, dtype=np.intp)
+        checkpoint = np.full(n, -1, dtype=np.intp)
+        if self._keys is None or self._codes.shape[1] != genes:
+            return source, checkpoint
+        position = np.searchsorted(self._keys, keys)
+        shared = np.full(n, -1, dtype=np.intp)
+        for candidate in (np.maximum(position - 1, 0), np.minimum(position, len(self._keys) - 1)):
+            differs = codes != self._codes[candidate]
+            length = np.where(differs.any(axis=1), differs.argmax(axis=1), genes)
+            better = length > shared
+            shared[better], source[better] = length[better], candidate[better]
+        checkpoint = np.searchsorted(boundaries, shared, side="right") - 1
+        source[checkpoint < 0] = -1
+        return source, checkpoint
+
+    @timed("walk.incremental")
+    def evaluate(self, population):
+        codes = encode_genes(np.asarray(population), self.alphabet)
+        n, genes = codes.shape
+        count("walk.genomes", n)
+        boundaries = self._boundaries(genes)
+        keys = self._keys_of(codes)
+        source, checkpoint = self._resume_points(codes, keys, boundaries)
+
+        # This batch's checkpoints start as copies of the source rows', the walk overwrites
+        # everything past each row's resume point
+        resumed = source >= 0
+        cells = np.full((n, len(boundaries)), self.maze.start_cell, dtype=np.intp)
+        smartness_at = np.zeros((n, len(boundaries)), dtype=np.int64)
+        moves_at = np.zeros((n, len(boundaries)), dtype=np.int64)
+        if resumed.any():
+            cells[resumed] = self._cells[source[resumed]]
+            smartness_at[resumed] = self._smartness[source[resumed]]
+            moves_at[resumed] = self._moves[source[resumed]]
+        rows = np.arange(n)
+        start = np.where(resumed, boundaries[checkpoint], 0)
+        cell = np.where(resumed, cells[rows, checkpoint], self.maze.start_cell)
+        smartness = np.where(resumed, smartness_at[rows, checkpoint], 0)
+        moves = np.where(resumed, moves_at[rows, checkpoint], 0)
+
+        # Runners join the walk at the gene they resume from, which is always a checkpoint,
+        # and like evaluate_population they're written back and dropped at the goal. Between
+        # checkpoints a step is the same few gathers as the batch walk, over fewer runners
+        order = np.argsort(start, kind="stable")
+        join_genes, at, size = np.unique(start[order], return_index=True, return_counts=True)
+        joins = {int(gene): order[a:a + c] for gene, a, c in zip(join_genes, at, size)}
+        steps = np.ascontiguousarray(codes.T)
+        # Runners are tracked by position cell * 5, so a step's table index is position + code
+        # and the next position is one more gather
+        width = self.maze.next_cell.shape[1]
+        next_position = (self.maze.next_cell * width).ravel()
+        hits_wall = self.maze.hits_wall.ravel()
+        goal_position = self.maze.goal_cell * width
+        checkpoint_of = {int(gene): b for b, gene in enumerate(boundaries)}
+
+        # Only wall hits are counted on the way: a move that doesn't hit a wall is a move, so
+        # moves is always a_offset + i + a_smartness
+        active = np.empty(0, dtype=np.intp)
+        a_position, a_smartness, a_offset = cell[active], smartness[active], moves[active]
+        for i in range(min(joins, default=genes), genes + 1):
+            if i in joins:
+                joining = joins[i]
+                active = np.concatenate([active, joining])
+                a_position = np.concatenate([a_position, cell[joining] * width])
+                a_smartness = np.concatenate([a_smartness, smartness[joining]])
+                a_offset = np.concatenate([a_offset, moves[joining] - smartness[joining] - i])
+            if self.stop_at_goal:
+                arrived = a_position == goal_position
+                if np.count_nonzero(arrived):
+                    done = active[arrived]
+                    moves[done] = a_offset[arrived] + i + a_smartness[arrived]
+                    cell[done] = self.maze.goal_cell
+                    smartness[done] = a_smartness[arrived] + self.goal_bonus * (genes - i)
+                    # Parked on the goal from here on, every later checkpoint is known now
+                    later = boundaries >= i
+                    cells[done[:, None], later] = self.maze.goal_cell
+                    moves_at[done[:, None], later] = moves[done][:, None]
+                    smartness_at[done[:, None], later] = a_smartness[arrived][:, None] + self.goal_bonus * (boundaries[later] - i)
+                    keep = ~arrived
+                    active, a_position, a_smartness, a_offset = active[keep], a_position[keep], a_smartness[keep], a_offset[keep]
+            if i in checkpoint_of:
+                b = checkpoint_of[i]
+                cells[active, b], smartness_at[active, b], moves_at[active, b] = a_position // width, a_smartness, a_offset + i + a_smartness
+            if i == genes:
+                break
+            t = a_position + steps[i, active]
+            a_smartness -= hits_wall.take(t)
+            a_position = next_position.take(t)
+        # Whoever never made it
+        cell[active], smartness[active], moves[active] = a_position // width, a_smartness, a_offset + genes + a_smartness
+
+        self.genes_total += n * genes
+        self.genes_walked += int((genes - start).sum())
+        self._remember(codes, keys, cells, smartness_at, moves_at, source)
+
+        x, y = cell % self.maze.cols, cell // self.maze.cols
+        return BatchResult(smartness, moves, x, y, self.maze.distance[y, x])
+
+    def _remember(self, codes, keys, cells, smartness, moves, source):
+        # The batch replaces what's remembered, except rows it resumed from: those are its
+        # parents, and under elitism they live on without being evaluated again
+        if self._keys is not None and self._codes.shape[1] == codes.shape[1]:
+            used = np.unique(source[source >= 0])
+            codes, keys = np.concatenate([codes, self._codes[used]]), np.concatenate([keys, self._keys[used]])
+            cells, smartness, moves = (np.concatenate([cells, self._cells[used]]), np.concatenate([smartness, self._smartness[used]]),
+                                       np.concatenate([moves, self._moves[used]]))
+        # Past max_rows the oldest go first: the batch comes before the rows kept from
+        # earlier batches, and a batch bigger than max_rows keeps its first rows.
+        # Duplicates are harmless, either copy is as good a match
+        kept = min(len(keys), self.max_rows)
+        order = np.argsort(keys[:kept])
+        self._keys, self._codes = keys[order], codes[order]
+        self._cells, self._smartness, self._moves = cells[order], smartness[order], moves[order]
+
+    def saved_fraction(self):
+        # Share of gene steps skipped thanks to checkpoints so far
+        return 1 - self.genes_walked / self.genes_total if self.genes_total else 0.0
+
+    def __call__(self, ga_instance, solutions, solution_indices):
+        return batch_fitness_values(self.evaluate(solutions))
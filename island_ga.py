@@ -0,0 +1,133 @@
+import argparse
+import multiprocessing
+import time
+from collections import namedtuple
+import numpy as np
+import pygad
+from pygad_test import GA_CONFIG, create_population, maze_fitness_batch
+from rng_streams import RunStreams
+from selection import fitness_order, is_better
+
+"""Island-model GA, K sub-populations evolve in their own processes and swap their best every few generations"""
+
+TOPOLOGIES = ("ring", "full")
+
+# best_fitness is the (smartness, -distance) pair, history has one EpochRecord per epoch
+IslandResult = namedtuple("IslandResult", ["best_solution", "best_fitness", "generations", "history"])
+EpochRecord = namedtuple("EpochRecord", ["epoch", "generations", "seconds", "best_fitness"])
+
+
+def _evolve_island(task):
+    # One epoch on one island, runs in a worker process. deadline is a time.time() value
+    # (comparable across processes), the epoch stops at the first generation past it
+    population, generations, random_seed, deadline = task
+    ga_instance = pygad.GA(**dict(GA_CONFIG,
+                                  num_generations = generations,
+                                  fitness_func = maze_fitness_batch,
+                                  fitness_batch_size = len(population),
+                                  initial_population = population,
+                                  random_seed = random_seed,
+                                  suppress_warnings = True,
+                                  on_generation = None if deadline is None else
+                                  lambda ga: "stop" if time.time() >= deadline else None))
+    ga_instance.run()
+    return ga_instance.population.copy(), np.asarray(ga_instance.last_generation_fitness).copy(), ga_instance.generations_completed
+
+
+def migrate(populations, fitnesses, migrants, topology="ring"):
+    # ring: island i sends its top `migrants` to island i + 1
+    # full: every island receives the best `migrants` out of all the other islands
+    # Migrants overwrite the receiver's worst individuals, in place
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"topology must be one of {TOPOLOGIES}, got {topology!r}")
+    k = len(populations)
+    if k < 2 or migrants == 0:
+        return
+
+    # Pick every island's emigrants before anyone is overwritten
+    outgoing = []
+    for population, fitness in zip(populations, fitnesses):
+        top = fitness_order(fitness)[:migrants]
+        outgoing.append((population[top].copy(), fitness[top].copy()))
+
+    for i in range(k):
+        if topology == "ring":
+            genes, fitness = outgoing[(i - 1) % k]
+        else:
+            genes = np.concatenate([outgoing[j][0] for j in range(k) if j != i])
+            fitness = np.concatenate([outgoing[j][1] for j in range(k) if j != i])
+            best = fitness_order(fitness)[:migrants]
+            genes, fitness = genes[best], fitness[best]
+
+        worst = fitness_order(fitnesses[i])[::-1][:len(genes)]
+        populations[i][worst] = genes
+        fitnesses[i][worst] = fitness
+
+
+def run_islands(num_islands=4, island_size=25, epochs=50, migration_interval=20, migrants=2,
+                topology="ring", workers=None, seed=12, time_budget=None):
+    # epochs x migration_interval generations per island, stops once time_budget seconds
+    # have passed, mid-epoch like a serial run's on_generation check
+    # Each island draws from its own RunStreams, so the run is bit-for-bit the same whatever the worker count
+    island_streams = RunStreams(seed).spawn(num_islands)
+    populations = [create_population(island_size, streams.generator("population")) for streams in island_streams]
+    fitnesses = [None] * num_islands
+    best_solution, best_fitness = None, None
+    history = []
+    start = time.perf_counter()
+    deadline = None if time_budget is None else time.time() + time_budget
+    generations = 0
+
+    pool = multiprocessing.Pool(workers or num_islands) if (workers or num_islands) > 1 else None
+    try:
+        for epoch in range(epochs):
+            # pygad wants an int seed, drawn fresh per epoch from the island's own "ga" stream
+            tasks = [(populations[i], migration_interval, int(island_streams[i].generator("ga").integers(2**32)), deadline)
+                     for i in range(num_islands)]
+            results = pool.map(_evolve_island, tasks) if pool is not None else list(map(_evolve_island, tasks))
+            populations = [population for population, _, _ in results]
+            fitnesses = [fitness for _, fitness, _ in results]
+            generations += max(completed for _, _, completed in results)
+
+            # Global best tracker
+            for population, fitness in zip(populations, fitnesses):
+                top = fitness_order(fitness)[0]
+                if best_fitness is None or is_better(fitness[top], best_fitness):
+                    best_solution, best_fitness = population[top].copy(), fitness[top].copy()
+
+            elapsed = time.perf_counter() - start
+            history.append(EpochRecord(epoch, generations, elapsed, best_fitness))
+            if time_budget is not None and elapsed >= time_budget:
+                break
+
+            migrate(populations, fitnesses, migrants, topology)
+    finally:
+        if pool is not None:
+            pool.close()
+            pool.join()
+
+    return IslandResult(best_solution, best_fitness, history[-1].generations, history)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--islands", type=int, default=4)
+    parser.add_argument("--island-size", type=int, default=25)
+    parser.add_argument("--epochs", type=int, default=50)
+    parser.add_argument("--migration-interval", type=int, default=20)
+    parser.add_argument("--migrants", type=int, default=2)
+    parser.add_argument("--topology", choices=TOPOLOGIES, default="ring")
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+
+    result = run_islands(args.islands, args.island_size, args.epochs, args.migration_interval,
+                         args.migrants, args.topology, args.workers)
+    for record in result.history:
+        print("Epoch : ", record.epoch, " generations : ", record.generations,
+              " seconds : ", round(record.seconds, 2), " best : ", record.best_fitness)
+    print("Parameters of the best solution : {solution}".format(solution=result.best_solution))
+    print("Fitness value of the best solution = {fitness}".format(fitness=result.best_fitness))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,11 @@
+import argparse
 import pygame
-import random
 import math
+import numpy as np
+from maze_provider import get_maze
+from maze_renderer import MazeRenderer
+from population import Population
+from move_codec import NUMPAD, encode_genes
 
 # Initialize pygame
 pygame.init()
@@ -18,70 +23,29 @@ BLUE = (0, 0, 255)
 screen = pygame.display.set_mode((WIDTH, HEIGHT))
 pygame.display.set_caption("Maze Navigator")
 
-# Maze generation with DFS and a fixed random seed
+# Maze generation with DFS and a fixed random seed, carved once by maze_provider
+# with its own Random so the global random module is never reseeded
 def generate_solvable_maze(rows, cols, seed=42):
-    # Set the random seed for reproducibility
-    random.seed(seed)
-    
-    # Initialize all cells as walls
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    
-    # Starting position
-    start_x, start_y = 0, 0
-    maze[start_y][start_x] = 0  # Start point is open
-    
-    # Stack for DFS and visited set
-    stack = [(start_x, start_y)]
-    visited = set(stack)
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    # DFS to carve out the maze
-    while stack:
-        x, y = stack[-1]
-        
-        # Find all unvisited neighbors
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx * 2, y + dy * 2
-            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
-                neighbors.append((nx, ny))
-
-        if neighbors:
-            # Choose a random neighbor
-            nx, ny = random.choice(neighbors)
-            
-            # Remove wall between current cell and chosen neighbor
-            maze[(y + ny) // 2][(x + nx) // 2] = 0
-            maze[ny][nx] = 0  # Make the neighbor cell a path
-            
-            # Mark as visited and push to stack
-            visited.add((nx, ny))
-            stack.append((nx, ny))
-        else:
-            # Backtrack if no unvisited neighbors
-            stack.pop()
-
-    # Ensure the center of the maze is open
-    maze[rows // 2][cols // 2] = 0
-    return maze
+    return get_maze(rows, cols, seed, goal_policy="center").to_list()
 
 # Distance calculation (Manhattan distance)
 def calculate_distance(x1, y1, x2, y2):
     return abs(x1 - x2) + abs(y1 - y2)
 
 # Main game function
-def main():
-    maze = generate_solvable_maze(ROWS, COLS)
+def main(rows=ROWS, cols=COLS):
+    maze = generate_solvable_maze(rows, cols)
     player_pos = [0, 0]  # Starting position (top-left corner)
-    center_pos = [ROWS // 2, COLS // 2]
+    center_pos = [rows // 2, cols // 2]
+
+    # The maze is drawn once, every frame only repaints the player's old and new cell and the text
+    renderer = MazeRenderer(screen, maze, max(WIDTH // cols, 1), goal=center_pos)
+    renderer.full_redraw()
 
     clock = pygame.time.Clock()
     running = True
 
     while running:
-        screen.fill(WHITE)
-
         # Handle events
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
@@ -90,44 +54,64 @@ def main():
                 x, y = player_pos
                 if event.key == pygame.K_LEFT and x > 0 and maze[y][x - 1] == 0:
                     player_pos[0] -= 1
-                elif event.key == pygame.K_RIGHT and x < COLS - 1 and maze[y][x + 1] == 0:
+                elif event.key == pygame.K_RIGHT and x < cols - 1 and maze[y][x + 1] == 0:
                     player_pos[0] += 1
                 elif event.key == pygame.K_UP and y > 0 and maze[y - 1][x] == 0:
                     player_pos[1] -= 1
-                elif event.key == pygame.K_DOWN and y < ROWS - 1 and maze[y + 1][x] == 0:
+                elif event.key == pygame.K_DOWN and y < rows - 1 and maze[y + 1][x] == 0:
                     player_pos[1] += 1
 
         # Calculate distance to center
         distance_to_center = calculate_distance(player_pos[0], player_pos[1], center_pos[0], center_pos[1])
 
+        # Draw player and display distance to center
+        renderer.draw([player_pos], f"Distance to Center: {distance_to_center}")
+
         # Check if player reached the center
         if player_pos == center_pos:
-            font = pygame.font.Font(None, 72)
-            win_text = font.render("You Win!", True, (0, 255, 0))
-            screen.blit(win_text, (WIDTH // 2 - win_text.get_width() // 2, HEIGHT // 2 - win_text.get_height() // 2))
-            pygame.display.flip()
+            renderer.banner("You Win!")
             pygame.time.delay(2000)
             running = False
 
-        # Draw maze
-        for row in range(ROWS):
-            for col in range(COLS):
-                color = BLACK if maze[row][col] == 1 else WHITE
-                pygame.draw.rect(screen, color, (col * CELL_SIZE, row * CELL_SIZE, CELL_SIZE, CELL_SIZE))
+        clock.tick(30)
+
+    pygame.quit()
 
-        # Draw player and center point
-        pygame.draw.rect(screen, RED, (player_pos[0] * CELL_SIZE, player_pos[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
-        pygame.draw.rect(screen, BLUE, (center_pos[0] * CELL_SIZE, center_pos[1] * CELL_SIZE, CELL_SIZE, CELL_SIZE))
 
-        # Display distance to center
-        font = pygame.font.Font(None, 36)
-        distance_text = font.render(f"Distance to Center: {distance_to_center}", True, (0, 0, 0))
-        screen.blit(distance_text, (10, 10))
+# Watch a whole population walk the maze at once, one gene per frame
+def play_agents(genomes, rows=ROWS, cols=COLS, fps=30, alphabet=NUMPAD):
+    built_maze = get_maze(rows, cols, goal_policy="center")
+    steps = encode_genes(np.asarray(genomes), alphabet).T
+    cells = np.full(steps.shape[1], built_maze.start_cell, dtype=np.intp)
 
-        pygame.display.flip()
-        clock.tick(30)
+    renderer = MazeRenderer(screen, built_maze.walls, max(WIDTH // cols, 1), goal=built_maze.goal)
+    renderer.full_redraw()
+    clock = pygame.time.Clock()
+
+    for step, codes in enumerate(steps, start=1):
+        if any(event.type == pygame.QUIT for event in pygame.event.get()):
+            break
+        cells = built_maze.next_cell[cells, codes]
+        occupied = np.unique(cells)
+        at_goal = int((cells == built_maze.goal_cell).sum())
+        renderer.draw(zip((occupied % cols).tolist(), (occupied // cols).tolist()),
+                      f"Step {step}/{len(steps)}  at center: {at_goal}/{len(cells)}")
+        clock.tick(fps)
 
     pygame.quit()
+    return cells
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=ROWS)
+    parser.add_argument("--cols", type=int, default=COLS)
+    parser.add_argument("--agents", type=int, default=None, help="play back this many random genomes instead of playing")
+    parser.add_argument("--genomes", default=None, help=".npy of 8/2/4/6 genomes to play back, e.g. a saved population")
+    args = parser.parse_args()
+    if args.genomes:
+        play_agents(np.load(args.genomes), args.rows, args.cols)
+    elif args.agents:
+        play_agents(Population.random(args.agents, 4 * (args.rows + args.cols), np.random.default_rng(12)).to_genes(NUMPAD), args.rows, args.cols)
+    else:
+        main(args.rows, args.cols)
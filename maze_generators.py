@@ -0,0 +1,183 @@
+import random
+import numpy as np
+
+"""Maze generators that scale to millions of cells, all returning a NumPy uint8 grid (1 = wall, 0 = path)"""
+
+# Every generator carves passages between the cells at even (x, y), exactly like
+# the original DFS backtracker, so they are interchangeable behind generate_maze
+GENERATORS = {}
+
+
+def register_generator(name):
+    # Decorator, a generator is generator(rows, cols, seed) -> uint8 grid before the goal is opened
+    def register(generator):
+        GENERATORS[name] = generator
+        return generator
+    return register
+
+
+def generate_maze(rows, cols, seed=42, algorithm="dfs", goal_policy="corner"):
+    if algorithm not in GENERATORS:
+        raise ValueError(f"algorithm must be one of {tuple(GENERATORS)}, got {algorithm!r}")
+    grid = GENERATORS[algorithm](rows, cols, seed)
+    open_goal(grid, goal_policy)
+    return grid
+
+
+def open_goal(maze, goal_policy="corner"):
+    # In place, works on a list of lists or a 2-D array
+    rows, cols = len(maze), len(maze[0])
+    if goal_policy == "corner":
+        # Ensure the bottom-right corner is open as the goal
+        maze[rows - 1][cols - 1] = 0
+
+        # Ensure there's an entry point to the goal cell if isolated
+        if maze[rows - 2][cols - 1] == 1 and maze[rows - 1][cols - 2] == 1:
+            maze[rows - 1][cols - 2] = 0  # Open the cell to the left
+    else:
+        # Ensure the center of the maze is open
+        maze[rows // 2][cols // 2] = 0
+
+
+def _padded_lattice(rows, cols):
+    # Flat bytearrays with a 2-cell border on every side. Returns (width, inside,
+    # grid, start): inside is 1 on the even cells a generator may carve, so a step of
+    # 2 off the edge lands on a 0 and needs no bounds check; start is (x, y) = (0, 0)
+    width = cols + 4
+    inside = bytearray(width * (rows + 4))
+    for y in range(0, rows, 2):
+        row_start = (y + 2) * width + 2
+        inside[row_start:row_start + cols:2] = b"\x01" * len(range(0, cols, 2))
+    grid = bytearray(b"\x01") * (width * (rows + 4))
+    return width, inside, grid, 2 * width + 2
+
+
+def _unpad(grid, rows, cols):
+    width = cols + 4
+    return np.frombuffer(grid, dtype=np.uint8).reshape(rows + 4, width)[2:rows + 2, 2:cols + 2].copy()
+
+
+@register_generator("dfs")
+def carve_dfs(rows, cols, seed=42):
+    # Same output as the scripts' original backtracker for the same seed: same
+    # neighbor order and the same random.Random(seed).choice calls, but with a
+    # bytearray visited grid, flat indices and a list stack instead of a set of tuples
+    rng = random.Random(seed)
+    width, unvisited, grid, start = _padded_lattice(rows, cols)
+    offsets = (-2, 2, -2 * width, 2 * width)  # left, right, up, down in (dx, dy) terms
+    choice = rng.choice
+
+    grid[start] = 0
+    unvisited[start] = 0
+    stack = [start]
+
+    while stack:
+        cell = stack[-1]
+        neighbors = [cell + offset for offset in offsets if unvisited[cell + offset]]
+        if neighbors:
+            neighbor = choice(neighbors)
+            grid[(cell + neighbor) // 2] = 0  # wall between the two cells
+            grid[neighbor] = 0
+            unvisited[neighbor] = 0
+            stack.append(neighbor)
+        else:
+            stack.pop()
+
+    return _unpad(grid, rows, cols)
+
+
+@register_generator("kruskal")
+def carve_kruskal(rows, cols, seed=42):
+    # Randomized Kruskal: the edge list is built and shuffled vectorized, then
+    # union-find with path halving keeps the edges that join two trees.
+    # Union-find runs on lattice indices, a quarter of the grid
+    rng = np.random.default_rng(seed)
+    lattice_rows, lattice_cols = (rows + 1) // 2, (cols + 1) // 2
+    lattice = np.arange(lattice_rows * lattice_cols).reshape(lattice_rows, lattice_cols)
+    a = np.concatenate([lattice[:, :-1].ravel(), lattice[:-1, :].ravel()])
+    b = np.concatenate([lattice[:, 1:].ravel(), lattice[1:, :].ravel()])
+    order = rng.permutation(len(a))
+
+    parent = list(range(lattice.size))
+    accepted = bytearray(len(a))
+    for edge, u, v in zip(order.tolist(), a[order].tolist(), b[order].tolist()):
+        while parent[u] != u:
+            parent[u] = u = parent[parent[u]]
+        while parent[v] != v:
+            parent[v] = v = parent[parent[v]]
+        if u != v:
+            parent[v] = u
+            accepted[edge] = 1
+
+    # Lattice (i, j) sits at grid (2i, 2j), an accepted edge opens the cell between its ends
+    accepted = np.frombuffer(accepted, dtype=bool)
+    a, b = a[accepted], b[accepted]
+    grid = np.ones((rows, cols), dtype=np.uint8)
+    grid[::2, ::2] = 0
+    grid[a // lattice_cols + b // lattice_cols, a % lattice_cols + b % lattice_cols] = 0
+    return grid
+
+
+@register_generator("prim")
+def carve_prim(rows, cols, seed=42):
+    # Randomized Prim: grow from (0, 0), each step opens a random frontier edge
+    # whose far cell isn't in the maze yet. Swap-remove keeps the frontier O(1)
+    rng = random.Random(seed)
+    width, unvisited, grid, start = _padded_lattice(rows, cols)
+    offsets = (-2, 2, -2 * width, 2 * width)
+    randbelow = rng.randrange
+
+    grid[start] = 0
+    unvisited[start] = 0
+    frontier = [(start, start + offset) for offset in offsets if unvisited[start + offset]]
+
+    while frontier:
+        i = randbelow(len(frontier))
+        frontier[i], frontier[-1] = frontier[-1], frontier[i]
+        cell, neighbor = frontier.pop()
+        if not unvisited[neighbor]:
+            continue
+        grid[(cell + neighbor) // 2] = 0
+        grid[neighbor] = 0
+        unvisited[neighbor] = 0
+        frontier.extend((neighbor, neighbor + offset) for offset in offsets if unvisited[neighbor + offset])
+
+    return _unpad(grid, rows, cols)
+
+
+@register_generator("wilson")
+def carve_wilson(rows, cols, seed=42):
+    # Wilson's algorithm, loop-erased random walks give a uniformly random spanning
+    # tree. Unbiased but the first walks are long, so it is the slowest on big grids
+    rng = random.Random(seed)
+    width, inside, grid, start = _padded_lattice(rows, cols)
+    offsets = (-2, 2, -2 * width, 2 * width)
+    randbelow = rng.randrange
+    in_tree = bytearray(len(inside))
+    exit_offset = {}  # last direction taken out of each cell on the current walk, later steps overwrite loops
+
+    in_tree[start] = 1
+    grid[start] = 0
+    for y in range(0, rows, 2):
+        for x in range(0, cols, 2):
+            walk_start = (y + 2) * width + x + 2
+            if in_tree[walk_start]:
+                continue
+            # Random walk until the tree is hit
+            cell = walk_start
+            while not in_tree[cell]:
+                offset = offsets[randbelow(4)]
+                if inside[cell + offset]:
+                    exit_offset[cell] = offset
+                    cell += offset
+            # Retrace the loop-erased path and add it to the tree
+            cell = walk_start
+            while not in_tree[cell]:
+                offset = exit_offset[cell]
+                in_tree[cell] = 1
+                grid[cell] = 0
+                grid[cell + offset // 2] = 0
+                cell += offset
+            exit_offset.clear()
+
+    return _unpad(grid, rows, cols)
@@ -0,0 +1,200 @@
+from collections import deque
+from dataclasses import dataclass, field
+from functools import cached_property, lru_cache
+import numpy as np
+from move_codec import DIRECTION_STEPS, NO_MOVE
+from maze_generators import GENERATORS, generate_maze
+from profiling import phase, timed
+
+"""Shared maze provider so every fitness function reuses the same built maze"""
+
+# How many distinct (rows, cols, seed, goal_policy, algorithm) mazes to keep around
+MAZE_CACHE_SIZE = 32
+
+# Where the goal cell lives and how it gets opened up
+#   corner: bottom-right cell, as in pygad_test.py
+#   center: middle cell, as in dumb_simple_maze.py / simple_maze_game.py / maze_game.py
+GOAL_POLICIES = ("corner", "center")
+
+
+@dataclass(frozen=True)
+class Maze:
+    rows: int
+    cols: int
+    seed: int
+    goal_policy: str
+    algorithm: str  # maze_generators.GENERATORS key
+    goal: tuple  # (x, y)
+    walls: np.ndarray = field(compare=False, repr=False)  # read-only uint8 grid, 1 = wall and 0 = path, walls[y, x]
+    distance: np.ndarray = field(compare=False, repr=False)  # read-only BFS steps to goal, distance[y, x], -1 if unreachable
+    next_cell: np.ndarray = field(compare=False, repr=False)  # cells x 5, cell reached by each move_codec direction code
+    hits_wall: np.ndarray = field(compare=False, repr=False)  # cells x 5, True where that move is blocked
+
+    # Cells are numbered y * cols + x
+    start_cell = 0
+
+    @property
+    def goal_cell(self):
+        return self.goal[1] * self.cols + self.goal[0]
+
+    @cached_property
+    def grid(self):
+        # Tuple of row tuples indexed grid[y][x], built on first use so huge mazes
+        # that only need the arrays never pay for it
+        return tuple(map(tuple, self.walls.tolist()))
+
+    @cached_property
+    def transition_lists(self):
+        # Plain-list copies of the tables, list indexing beats NumPy scalar indexing in a Python loop
+        return self.next_cell.tolist(), self.hits_wall.tolist()
+
+    @cached_property
+    def dead_ends(self):
+        # Read-only bool per cell, True for a path cell with a single way out that isn't the goal
+        exits = (~self.hits_wall[:, :NO_MOVE]).sum(axis=1)
+        dead_ends = (exits == 1) & (self.walls.ravel() == 0)
+        dead_ends[self.goal_cell] = False
+        dead_ends.flags.writeable = False
+        return dead_ends
+
+    @cached_property
+    def enters_dead_end(self):
+        # cells x 5 like next_cell, True where that move walks into a dead end
+        enters = self.dead_ends[self.next_cell] & ~self.hits_wall
+        enters.flags.writeable = False
+        return enters
+
+    def goal_distance(self, x, y):
+        # O(1) replacement for shortest_path_distance(grid, (x, y), goal)
+        return int(self.distance[y, x])
+
+    def to_list(self):
+        # Fresh mutable copy for code that still wants a list of lists
+        return self.walls.tolist()
+
+
+def carve_maze(rows, cols, seed=42, goal_policy="corner", algorithm="dfs"):
+    # List-of-lists grid, the "dfs" algorithm is the scripts' backtracker and gives
+    # the exact same layout for the same seed
+    return generate_maze(rows, cols, seed, algorithm, goal_policy).tolist()
+
+
+def goal_position(rows, cols, goal_policy="corner"):
+    if goal_policy == "corner":
+        return (cols - 1, rows - 1)
+    return (cols // 2, rows // 2)
+
+
+# Calculate the shortest path from a position to the goal
+@timed("bfs.shortest_path")
+def shortest_path_distance(maze, start, goal):
+    rows, cols = len(maze), len(maze[0])
+    queue = deque([(start, 0)])  # Queue holds (position, distance)
+    visited = set()
+    visited.add(start)
+
+    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
+
+    while queue:
+        (x, y), dist = queue.popleft()
+
+        # If we've reached the goal, return the distance
+        if (x, y) == goal:
+            return dist
+
+        # Explore neighbors
+        for dx, dy in directions:
+            nx, ny = x + dx, y + dy
+
+            # Check if the new position is within bounds and is a path (0) and not visited
+            if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] == 0 and (nx, ny) not in visited:
+                visited.add((nx, ny))
+                queue.append(((nx, ny), dist + 1))
+
+    return -1  # Return -1 if there's no path to the goal
+
+
+# One reverse BFS from the goal gives the shortest path distance from every cell at once.
+# Level by level over a flat grid padded with a wall border, so neighbors need no
+# bounds checks and the frontier lists stay small even on millions of cells
+@timed("bfs.distance_field")
+def distance_field(maze, goal):
+    walls = np.asarray(maze, dtype=np.uint8)
+    rows, cols = walls.shape
+    width = cols + 2
+    blocked = bytearray(np.pad(walls, 1, constant_values=1).tobytes())
+    distance = np.full((rows + 2) * width, -1, dtype=np.int64)  # -1 = no path to the goal, same as shortest_path_distance
+
+    goal_x, goal_y = goal
+    start = (goal_y + 1) * width + goal_x + 1
+    blocked[start] = 1
+    distance[start] = 0
+    offsets = (-1, 1, -width, width)  # Left, Right, Up, Down
+
+    frontier = [start]
+    dist = 0
+    while frontier:
+        dist += 1
+        next_frontier = []
+        for cell in frontier:
+            for offset in offsets:
+                neighbor = cell + offset
+                if not blocked[neighbor]:
+                    blocked[neighbor] = 1
+                    next_frontier.append(neighbor)
+        distance[next_frontier] = dist
+        frontier = next_frontier
+
+    return distance.reshape(rows + 2, width)[1:-1, 1:-1].copy()
+
+
+# Compile the grid into (cells x 5) move tables so a walk is just integer gathers.
+# Columns follow move_codec's direction codes, the last column is NO_MOVE.
+def transition_table(walls):
+    rows, cols = walls.shape
+    ys, xs = np.indices((rows, cols))
+    cells = (ys * cols + xs).ravel()
+
+    next_cell = np.empty((rows * cols, len(DIRECTION_STEPS)), dtype=np.int32)
+    for code, (dx, dy) in enumerate(DIRECTION_STEPS):
+        nx, ny = xs + dx, ys + dy
+        in_bounds = (nx >= 0) & (nx < cols) & (ny >= 0) & (ny < rows)
+        can_move = in_bounds & (walls[np.clip(ny, 0, rows - 1), np.clip(nx, 0, cols - 1)] == 0)
+        next_cell[:, code] = np.where(can_move, ny * cols + nx, ys * cols + xs).ravel()
+
+    # A real move always changes cell, so staying put means the move was blocked
+    hits_wall = next_cell == cells[:, None]
+    hits_wall[:, NO_MOVE] = True
+    return next_cell, hits_wall
+
+
+@lru_cache(maxsize=MAZE_CACHE_SIZE)
+def _build_maze(rows, cols, seed, goal_policy, algorithm):
+    with phase("maze.carve"):
+        walls = generate_maze(rows, cols, seed, algorithm, goal_policy)
+    goal = goal_position(rows, cols, goal_policy)
+    distance = distance_field(walls, goal)
+    with phase("maze.transitions"):
+        next_cell, hits_wall = transition_table(walls)
+    for table in (walls, distance, next_cell, hits_wall):
+        table.flags.writeable = False
+    return Maze(rows, cols, seed, goal_policy, algorithm, goal, walls, distance, next_cell, hits_wall)
+
+
+def get_maze(rows, cols, seed=42, goal_policy="corner", algorithm="dfs"):
+    # Normalize the key here so get_maze(20, 20) and get_maze(20, 20, 42)
+    # land on the same cache entry
+    if goal_policy not in GOAL_POLICIES:
+        raise ValueError(f"goal_policy must be one of {GOAL_POLICIES}, got {goal_policy!r}")
+    if algorithm not in GENERATORS:
+        raise ValueError(f"algorithm must be one of {tuple(GENERATORS)}, got {algorithm!r}")
+    return _build_maze(int(rows), int(cols), int(seed), goal_policy, algorithm)
+
+
+def maze_cache_info():
+    # hits / misses / maxsize / currsize, misses == number of mazes actually built
+    return _build_maze.cache_info()
+
+
+def clear_maze_cache():
+    _build_maze.cache_clear()
@@ -0,0 +1,124 @@
+import numpy as np
+import pygame
+
+"""Dirty-rect maze rendering: the maze is drawn once to a cached Surface, each frame only repaints cells that changed"""
+
+WHITE = (255, 255, 255)
+BLACK = (0, 0, 0)
+RED = (255, 0, 0)
+BLUE = (0, 0, 255)
+
+# Past this many dirty rects one full-screen update is cheaper than the rect list
+MAX_DIRTY_RECTS = 2000
+# Rendered text surfaces kept per renderer, HUD strings repeat a lot (distances, counters)
+TEXT_CACHE_SIZE = 256
+
+
+class MazeRenderer:
+    # walls: rows x cols array or list of lists, 1 = wall. goal: (x, y) cell drawn in
+    # goal_color and kept on top of the agents, like maze_game always did
+
+    def __init__(self, screen, walls, cell_size, goal=None, goal_color=BLUE, agent_color=RED, font_size=36):
+        self.screen = screen
+        self.walls = np.asarray(walls, dtype=np.uint8)
+        self.rows, self.cols = self.walls.shape
+        self.cell_size = cell_size
+        self.goal = tuple(goal) if goal is not None else None
+        self.agent_color = agent_color
+        self.font = pygame.font.Font(None, font_size)
+        self._fonts = {font_size: self.font}
+        self._text_cache = {}
+        self._agents = []  # cells drawn last frame
+        self._hud_rect = None
+        self._hud_text = None
+        self.background = self._render_background(goal_color)
+
+    def _render_background(self, goal_color):
+        # One pixel per cell from an array, then a nearest-neighbour scale up, so a
+        # 1000 x 1000 maze costs one blit instead of a million draw.rect calls
+        colors = np.where(self.walls[..., None] == 1, BLACK, WHITE).astype(np.uint8)
+        if self.goal is not None:
+            colors[self.goal[1], self.goal[0]] = goal_color
+        cells = pygame.surfarray.make_surface(colors.transpose(1, 0, 2))
+        background = pygame.Surface(self.screen.get_size())
+        background.fill(WHITE)
+        background.blit(pygame.transform.scale(cells, (self.cols * self.cell_size, self.rows * self.cell_size)), (0, 0))
+        # Same pixel format as the display makes every later blit a plain copy
+        return background.convert() if pygame.display.get_surface() is not None else background
+
+    def cell_rect(self, x, y):
+        return pygame.Rect(x * self.cell_size, y * self.cell_size, self.cell_size, self.cell_size)
+
+    def get_font(self, size):
+        if size not in self._fonts:
+            self._fonts[size] = pygame.font.Font(None, size)
+        return self._fonts[size]
+
+    def render_text(self, text, color=BLACK, size=None):
+        # Text surfaces are cached by (text, color, size), a HUD that didn't change re-renders nothing
+        key = (text, color, size)
+        surface = self._text_cache.get(key)
+        if surface is None:
+            if len(self._text_cache) >= TEXT_CACHE_SIZE:
+                self._text_cache.pop(next(iter(self._text_cache)))
+            font = self.font if size is None else self.get_font(size)
+            surface = self._text_cache[key] = font.render(text, True, color)
+        return surface
+
+    def full_redraw(self):
+        self.screen.blit(self.background, (0, 0))
+        self._agents = []
+        self._hud_rect = None
+        self._hud_text = None
+        pygame.display.flip()
+
+    def draw(self, agents, hud=None, hud_pos=(10, 10)):
+        # agents: iterable of (x, y) cells, hud: text for the top-left corner or None.
+        # Repaints last frame's agent cells and HUD from the background, draws the new
+        # ones and pushes only those rects to the display. Returns the dirty rects
+        agents = [tuple(agent) for agent in agents]
+        old, new = set(self._agents), set(agents)
+        dirty = []
+        for x, y in old - new:
+            rect = self.cell_rect(x, y)
+            self.screen.blit(self.background, rect, rect)
+            dirty.append(rect)
+        for x, y in new - old:
+            if (x, y) == self.goal:
+                continue
+            rect = self.cell_rect(x, y)
+            self.screen.fill(self.agent_color, rect)
+            dirty.append(rect)
+        self._agents = agents
+
+        # The HUD is only repainted when its text changes or an agent cell under it did
+        if self._hud_rect is not None and any(rect.colliderect(self._hud_rect) for rect in dirty):
+            self._hud_text = None
+        if hud != self._hud_text:
+            if self._hud_rect is not None:
+                self.screen.blit(self.background, self._hud_rect, self._hud_rect)
+                dirty.append(self._hud_rect)
+                # Agents under the old HUD were just painted over
+                for x, y in new:
+                    rect = self.cell_rect(x, y)
+                    if rect.colliderect(self._hud_rect) and (x, y) != self.goal:
+                        self.screen.fill(self.agent_color, rect)
+                self._hud_rect = None
+            if hud is not None:
+                self._hud_rect = self.screen.blit(self.render_text(hud), hud_pos)
+                dirty.append(self._hud_rect)
+            self._hud_text = hud
+
+        if len(dirty) > MAX_DIRTY_RECTS:
+            pygame.display.flip()
+        elif dirty:
+            pygame.display.update(dirty)
+        return dirty
+
+    def banner(self, text, color=(0, 255, 0), size=72):
+        # Centered message, e.g. "You Win!"
+        surface = self.render_text(text, color, size)
+        width, height = self.screen.get_size()
+        rect = self.screen.blit(surface, (width // 2 - surface.get_width() // 2, height // 2 - surface.get_height() // 2))
+        pygame.display.update(rect)
+        return rect
@@ -0,0 +1,42 @@
+from move_codec import NUMPAD, encode_genes
+from profiling import count, timed
+
+"""Walk a single genome through a compiled Maze using its transition tables"""
+
+
+@timed("walk.genome")
+def walk_genome(maze, genome, alphabet=NUMPAD, goal_bonus=100, stop_at_goal=True):
+    # Scalar twin of batch_fitness.evaluate_population, returns (smartness, moves, x, y).
+    # stop_at_goal: the walk ends on the goal and every gene left over is worth
+    # goal_bonus, added in one go, that's maze_fitness. stop_at_goal=False and
+    # goal_bonus=0 keep walking past the goal, that's score_attempt
+    count("walk.genomes")
+    next_cell, hits_wall = maze.transition_lists
+    goal_cell = maze.goal_cell
+    cell = maze.start_cell
+    smartness = 0
+    moves = 0
+
+    codes = encode_genes(genome, alphabet).tolist()
+    for i, code in enumerate(codes):
+        if stop_at_goal and cell == goal_cell:
+            smartness += goal_bonus * (len(codes) - i)
+            break
+        if hits_wall[cell][code]:
+            smartness -= 1
+        else:
+            cell = next_cell[cell][code]
+            moves += 1
+
+    return smartness, moves, cell % maze.cols, cell // maze.cols
+
+
+def walk_cells(maze, genome, alphabet=NUMPAD):
+    # Cell index after every gene, no goal stop, this is what show_maze_progression replays
+    next_cell, _ = maze.transition_lists
+    cell = maze.start_cell
+    cells = []
+    for code in encode_genes(genome, alphabet).tolist():
+        cell = next_cell[cell][code]
+        cells.append(cell)
+    return cells
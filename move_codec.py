@@ -0,0 +1,51 @@
+import numpy as np
+
+"""One codec for every gene alphabet, genes become direction codes 0-3 for the transition tables"""
+
+# Direction codes, also the column order of Maze.next_cell / Maze.hits_wall
+UP, DOWN, LEFT, RIGHT = 0, 1, 2, 3
+# Anything that isn't a move (the scripts' final else branch), always a wall hit
+NO_MOVE = 4
+
+# (dx, dy) for each direction code, NO_MOVE stays put
+DIRECTION_STEPS = ((0, -1), (0, 1), (-1, 0), (1, 0), (0, 0))
+# Code of the move that undoes each move, indexed by direction code
+OPPOSITE = np.array([DOWN, UP, RIGHT, LEFT, NO_MOVE], dtype=np.uint8)
+
+# Gene alphabets already in use
+#   numpad: pygad_test.py and dumb_simple_maze.py (8/2/4/6)
+#   wasd: simple_maze_game.py and dumb_simple_maze.create_population
+NUMPAD = {8: UP, 2: DOWN, 4: LEFT, 6: RIGHT}
+WASD = {"w": UP, "s": DOWN, "a": LEFT, "d": RIGHT}
+# Genes that already are direction codes, e.g. population.Population.genes
+CODES = {UP: UP, DOWN: DOWN, LEFT: LEFT, RIGHT: RIGHT}
+
+# Fast path for integer genes, index by the gene value itself
+_NUMPAD_TABLE = np.full(10, NO_MOVE, dtype=np.uint8)
+for _gene, _code in NUMPAD.items():
+    _NUMPAD_TABLE[_gene] = _code
+
+
+def encode_genes(genes, alphabet=NUMPAD):
+    # genes: 1-D genome or 2-D population, returns same-shaped uint8 direction codes
+    genes = np.asarray(genes)
+    if alphabet is CODES and genes.dtype.kind in "iu":
+        # Already codes, only clamp anything outside UP..RIGHT to NO_MOVE
+        if genes.dtype.kind == "i":
+            genes = np.where(genes < 0, NO_MOVE, genes)
+        return np.minimum(genes, NO_MOVE).astype(np.uint8, copy=False)
+    if alphabet is NUMPAD and genes.dtype.kind in "iu":
+        # Out-of-range genes read slot 0, which is NO_MOVE
+        in_range = (genes >= 0) & (genes < len(_NUMPAD_TABLE))
+        return _NUMPAD_TABLE[np.where(in_range, genes, 0)]
+
+    # General path, map each distinct gene once
+    values, inverse = np.unique(genes, return_inverse=True)
+    codes = np.array([alphabet.get(value.item(), NO_MOVE) for value in values], dtype=np.uint8)
+    return codes[inverse].reshape(genes.shape)
+
+
+def decode_genes(codes, alphabet=NUMPAD):
+    # Inverse of encode_genes for the four real moves, one gather for the whole array
+    lookup = {code: gene for gene, code in alphabet.items()}
+    return np.array([lookup[code] for code in (UP, DOWN, LEFT, RIGHT)])[np.asarray(codes)]
@@ -0,0 +1,94 @@
+import os
+import multiprocessing
+import numpy as np
+from maze_provider import get_maze
+from batch_fitness import evaluate_population, batch_fitness_values
+from fitness_cache import FitnessCache, evaluate_cached
+
+"""Spread fitness evaluation over a process pool, each worker gets the compiled maze once"""
+
+# Most individuals per task, big enough that the batched walk dominates IPC
+DEFAULT_CHUNK_SIZE = 256
+
+# Set once per worker by _init_worker, never pickled per task
+_worker_maze = None
+_worker_cache = None
+
+
+def _init_worker(maze, cache_size=None):
+    # The maze carries its grid, distance field and transition tables, so one
+    # pickle at pool startup gives the worker everything it needs.
+    # cache_size gives every worker its own FitnessCache
+    global _worker_maze, _worker_cache
+    _worker_maze = maze
+    _worker_cache = FitnessCache(cache_size) if cache_size else None
+
+
+def _evaluate_with(chunk, maze, cache):
+    # Fitness values plus this chunk's (hits, misses) so the parent can add them up
+    if cache is None:
+        return batch_fitness_values(evaluate_population(chunk, maze)), (0, 0)
+    hits, misses = cache.hits, cache.misses
+    values = evaluate_cached(chunk, maze, cache)
+    return values, (cache.hits - hits, cache.misses - misses)
+
+
+def _evaluate_chunk(chunk):
+    return _evaluate_with(chunk, _worker_maze, _worker_cache)
+
+
+class ParallelEvaluator:
+    # Callable as a pygad fitness function with fitness_batch_size set, or use evaluate() directly.
+    # Chunks go out with Pool.map, so results come back in population order no
+    # matter how many workers there are or which one finishes first.
+
+    def __init__(self, rows=20, cols=20, seed=42, workers=None, chunk_size=DEFAULT_CHUNK_SIZE, cache_size=None):
+        self.maze = get_maze(rows, cols, seed)
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.cache_size = cache_size
+        # Summed over all per-worker caches
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._pool = None
+        # Only used when workers == 1 and everything runs in this process
+        self._local_cache = FitnessCache(cache_size) if cache_size else None
+
+    def start(self):
+        if self._pool is None:
+            self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker,
+                                              initargs=(self.maze, self.cache_size))
+        return self
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def evaluate(self, population):
+        # n x 2 array of (smartness, -distance), same as maze_fitness_batch
+        population = np.asarray(population)
+        # chunk_size caps a task, a GA generation of a few hundred rows is still split
+        # so every worker gets a share
+        chunk_size = max(1, min(self.chunk_size, -(-len(population) // self.workers)))
+        chunks = [population[start:start + chunk_size] for start in range(0, len(population), chunk_size)]
+        if self.workers == 1:
+            # No point paying for IPC with a single worker
+            results = [_evaluate_with(chunk, self.maze, self._local_cache) for chunk in chunks]
+        else:
+            self.start()
+            results = self._pool.map(_evaluate_chunk, chunks)
+        for _, (hits, misses) in results:
+            self.cache_hits += hits
+            self.cache_misses += misses
+        return np.concatenate([values for values, _ in results])
+
+    def __call__(self, ga_instance, solutions, solution_indices):
+        return self.evaluate(solutions)
@@ -0,0 +1,84 @@
+import numpy as np
+from move_codec import CODES, NO_MOVE, NUMPAD, decode_genes, encode_genes
+
+"""All genomes in one contiguous uint8 matrix of direction codes instead of a list of per-individual arrays"""
+
+# Four direction codes fit in 2 bits, so 4 genes per byte when packed
+GENES_PER_BYTE = 4
+
+
+class Population:
+    # genes is an individuals x genome_length uint8 matrix of move_codec direction codes.
+    # Indexing with an int or slice gives a Population that is a view, so
+    # mutate() and crossover() on it write straight into the parent matrix.
+
+    def __init__(self, genes):
+        genes = np.asarray(genes)
+        if genes.ndim != 2:
+            raise ValueError(f"genes must be 2-D (individuals x genes), got shape {genes.shape}")
+        self.genes = genes if genes.dtype == np.uint8 else encode_genes(genes, CODES)
+
+    @classmethod
+    def random(cls, pop_size, genome_length=200, rng=None):
+        # The whole population in one RNG call
+        rng = np.random.default_rng() if rng is None else rng
+        return cls(rng.integers(0, 4, size=(pop_size, genome_length), dtype=np.uint8))
+
+    @classmethod
+    def from_genes(cls, genes, alphabet=NUMPAD):
+        # From pygad's int matrix, a list of 8/2/4/6 arrays, w/a/s/d strings, ...
+        return cls(encode_genes(np.asarray(genes), alphabet))
+
+    def to_genes(self, alphabet=NUMPAD):
+        # Back to an alphabet the scripts and pygad understand
+        return decode_genes(self.genes, alphabet)
+
+    def __len__(self):
+        return len(self.genes)
+
+    def __getitem__(self, index):
+        # Basic indexing keeps the view, a lone row stays 2-D so it is still a Population
+        if isinstance(index, (int, np.integer)):
+            index = slice(index, index + 1 if index != -1 else None)
+        return Population(self.genes[index])
+
+    @property
+    def genome_length(self):
+        return self.genes.shape[1]
+
+    @property
+    def nbytes(self):
+        return self.genes.nbytes
+
+    def mutate(self, rate, rng=None):
+        # Each gene is redrawn with probability rate, in place. Returns self for chaining
+        rng = np.random.default_rng() if rng is None else rng
+        mask = rng.random(self.genes.shape) < rate
+        self.genes[mask] = rng.integers(0, 4, size=int(mask.sum()), dtype=np.uint8)
+        return self
+
+    def crossover(self, parents_a, parents_b, out, rng=None):
+        # Scattered crossover of rows parents_a[i] x parents_b[i] written into out (a
+        # Population, typically a slice of this one). Each child gene comes from
+        # parent a or b with equal odds
+        rng = np.random.default_rng() if rng is None else rng
+        take_a = rng.random((len(parents_a), self.genome_length)) < .5
+        np.copyto(out.genes, self.genes[parents_b])
+        np.copyto(out.genes, self.genes[parents_a], where=take_a)
+        return out
+
+    def pack(self):
+        # 2-bit packed copy, genome_length / 4 bytes per individual, for storage or transfer
+        if (self.genes >= NO_MOVE).any():
+            raise ValueError("only the four real moves can be packed into 2 bits")
+        n, length = self.genes.shape
+        padded = np.zeros((n, -(-length // GENES_PER_BYTE) * GENES_PER_BYTE), dtype=np.uint8)
+        padded[:, :length] = self.genes
+        quads = padded.reshape(n, -1, GENES_PER_BYTE)
+        return quads[:, :, 0] | (quads[:, :, 1] << 2) | (quads[:, :, 2] << 4) | (quads[:, :, 3] << 6)
+
+    @classmethod
+    def unpack(cls, packed, genome_length):
+        packed = np.asarray(packed, dtype=np.uint8)
+        quads = np.stack([(packed >> shift) & 3 for shift in (0, 2, 4, 6)], axis=-1)
+        return cls(np.ascontiguousarray(quads.reshape(len(packed), -1)[:, :genome_length]))
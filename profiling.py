@@ -0,0 +1,151 @@
+import os
+import json
+import time
+import cProfile
+import threading
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+"""Switchable per-phase timers and counters for GA runs, with a text report and cProfile / Chrome-trace export"""
+
+# MAZE_PROFILE=1 turns the timers on at import, enable() / disable() switch them at runtime
+ENV_VAR = "MAZE_PROFILE"
+# Chrome trace events kept, the per-phase totals are exact regardless
+MAX_TRACE_EVENTS = 1_000_000
+
+_enabled = os.environ.get(ENV_VAR, "") not in ("", "0")
+_totals = {}  # phase -> [calls, total ns]
+_counters = {}
+_trace = []  # (phase, start ns, duration ns, thread id)
+_started = time.perf_counter_ns()
+_NULL = nullcontext()
+
+
+def enable():
+    global _enabled
+    _enabled = True
+
+
+def disable():
+    global _enabled
+    _enabled = False
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    global _started
+    _totals.clear()
+    _counters.clear()
+    _trace.clear()
+    _started = time.perf_counter_ns()
+
+
+def _add(name, start, duration):
+    entry = _totals.get(name)
+    if entry is None:
+        entry = _totals[name] = [0, 0]
+    entry[0] += 1
+    entry[1] += duration
+    if len(_trace) < MAX_TRACE_EVENTS:
+        _trace.append((name, start, duration, threading.get_ident()))
+
+
+@contextmanager
+def _timed_block(name):
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        _add(name, start, time.perf_counter_ns() - start)
+
+
+def phase(name):
+    # with phase("maze.carve"): ..., a shared no-op context when profiling is off
+    return _timed_block(name) if _enabled else _NULL
+
+
+def timed(name):
+    # Decorator version of phase(), when off it costs one global lookup per call
+    def decorate(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _add(name, start, time.perf_counter_ns() - start)
+        return wrapper
+    return decorate
+
+
+def count(name, n=1):
+    if _enabled:
+        _counters[name] = _counters.get(name, 0) + n
+
+
+# Methods run() calls once per generation, and the phase each one is,
+# for pygad.GA and for ga_engine.GAEngine
+GA_PHASES = {
+    "cal_pop_fitness": "ga.fitness",
+    "run_select_parents": "ga.selection",
+    "run_crossover": "ga.crossover",
+    "run_mutation": "ga.mutation",
+    "run_update_population": "ga.update_population",
+    "evaluate": "ga.fitness",
+    "select_parents": "ga.selection",
+    "crossover": "ga.crossover",
+    "mutate": "ga.mutation",
+}
+
+
+def instrument_ga(ga_instance):
+    # Time the GA operators of this one instance by shadowing its bound methods,
+    # the class itself and other instances are untouched
+    for method, name in GA_PHASES.items():
+        if hasattr(ga_instance, method):
+            setattr(ga_instance, method, timed(name)(getattr(ga_instance, method)))
+    return ga_instance
+
+
+def stats():
+    # {phase: (calls, total seconds)} and the counters
+    return {name: (calls, total / 1e9) for name, (calls, total) in _totals.items()}, dict(_counters)
+
+
+def report():
+    # Per-phase table, slowest first. Phases nest (ga.fitness contains walk.*), so
+    # the share column is against wall time since reset() and doesn't add up to 100%
+    wall = (time.perf_counter_ns() - _started) / 1e9
+    phases, counters = stats()
+    lines = [f"{'phase':<24} {'calls':>9} {'total s':>9} {'mean us':>10} {'% wall':>7}"]
+    for name, (calls, total) in sorted(phases.items(), key=lambda item: -item[1][1]):
+        lines.append(f"{name:<24} {calls:>9} {total:>9.3f} {total / calls * 1e6:>10.1f} {total / wall:>7.1%}")
+    for name, value in sorted(counters.items()):
+        lines.append(f"{name:<24} {value:>9}")
+    lines.append(f"{'wall':<24} {'':>9} {wall:>9.3f}")
+    return "\n".join(lines)
+
+
+def export_chrome_trace(path):
+    # Load in chrome://tracing or https://ui.perfetto.dev, one complete ("X") event per timed call
+    events = [{"name": name, "ph": "X", "ts": (start - _started) / 1e3, "dur": duration / 1e3,
+               "pid": os.getpid(), "tid": tid} for name, start, duration, tid in _trace]
+    with open(path, "w") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+
+@contextmanager
+def cprofile_to(path):
+    # Full cProfile of the block, read it with python -m pstats path
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
@@ -1,9 +1,26 @@
+import argparse
 import pygad
-import random
 import numpy as np
 import pandas as pd
 import math
-from collections import deque
+from contextlib import nullcontext
+from maze_provider import get_maze, maze_cache_info
+from batch_fitness import evaluate_population, batch_fitness_values
+from maze_walk import walk_genome
+from replay import trajectory, print_frames, export_replay
+from parallel_fitness import ParallelEvaluator
+from incremental_fitness import IncrementalEvaluator
+from fitness_cache import CachedFitness, FitnessCache
+from trajectory_features import FeatureFitness, parse_weights
+from curriculum_fitness import CurriculumFitness, curriculum_mazes
+from population import Population
+from move_codec import NUMPAD
+from rng_streams import RunStreams
+from ga_engine import GAEngine
+from ga_checkpoint import CheckpointWriter, resume_ga
+from ga_metrics import MetricsRecorder, open_sink
+from ga_archive import ArchiveRecorder, GenerationArchive
+import profiling
 
 ###
     ###
@@ -15,65 +32,18 @@ from collections import deque
     ###
 ###
 
-def create_population(pop_size, seed = 12):
-    random.seed(seed)
-    return [np.random.choice((4,8,6,2),200) for x in range(0,pop_size)]
+def create_population(pop_size, seed = 12, genome_length = 200):
+    # seed can be an int, a SeedSequence or a Generator (e.g. RunStreams.generator("population")),
+    # it only feeds this population's own Generator and never touches global random state.
+    # One uint8 matrix from a single RNG call, decoded to the 8/2/4/6 genes pygad works with
+    return Population.random(pop_size, genome_length, np.random.default_rng(seed)).to_genes(NUMPAD)
 
 
 ### Do Maze Stuff
+@profiling.timed("maze.generate")
 def generate_solvable_maze(rows, cols, seed=42):
-    # Set the random seed for reproducibility
-    random.seed(seed)
-    
-    # Initialize all cells as walls
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    
-    # Starting position
-    start_x, start_y = 0, 0
-    maze[start_y][start_x] = 0  # Start point is open
-    
-    # Stack for DFS and visited set
-    stack = [(start_x, start_y)]
-    visited = set(stack)
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    # DFS to carve out the maze
-    while stack:
-        x, y = stack[-1]
-        
-        # Find all unvisited neighbors
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx * 2, y + dy * 2
-            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
-                neighbors.append((nx, ny))
-
-        if neighbors:
-            # Choose a random neighbor
-            nx, ny = random.choice(neighbors)
-            
-            # Remove wall between current cell and chosen neighbor
-            maze[(y + ny) // 2][(x + nx) // 2] = 0
-            maze[ny][nx] = 0  # Make the neighbor cell a path
-            
-            # Mark as visited and push to stack
-            visited.add((nx, ny))
-            stack.append((nx, ny))
-        else:
-            # Backtrack if no unvisited neighbors
-            stack.pop()
-
-    # Ensure the bottom-right corner is open as the goal
-    maze[rows - 1][cols - 1] = 0
-
-    # Ensure there's an entry point to the goal cell if isolated
-    if maze[rows - 2][cols - 1] == 1 and maze[rows - 1][cols - 2] == 1:
-        # Open the cell above or to the left
-        #maze[rows - 2][cols - 1] = 0  # Open the cell above
-        maze[rows - 1][cols - 2] = 0  # Open the cell to the left
-
-    return maze
+    # Built once per (rows, cols, seed) by maze_provider, this hands back a mutable copy
+    return get_maze(rows, cols, seed).to_list()
 
 
 # Calculate Manhattan distance to the goal
@@ -81,34 +51,6 @@ def calculate_distance(x1, y1, x2, y2):
     return abs(x1 - x2) + abs(y1 - y2)
 
 
-# Calculate the shortest path from a position to the goal
-def shortest_path_distance(maze, start, goal):
-    rows, cols = len(maze), len(maze[0])
-    queue = deque([(start, 0)])  # Queue holds (position, distance)
-    visited = set()
-    visited.add(start)
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    while queue:
-        (x, y), dist = queue.popleft()
-
-        # If we've reached the goal, return the distance
-        if (x, y) == goal:
-            return dist
-
-        # Explore neighbors
-        for dx, dy in directions:
-            nx, ny = x + dx, y + dy
-
-            # Check if the new position is within bounds and is a path (0) and not visited
-            if 0 <= nx < cols and 0 <= ny < rows and maze[ny][nx] == 0 and (nx, ny) not in visited:
-                visited.add((nx, ny))
-                queue.append(((nx, ny), dist + 1))
-
-    return -1  # Return -1 if there's no path to the goal
-
-
 # Print the maze in text form
 def print_maze(maze, player_pos):
     for y, row in enumerate(maze):
@@ -129,38 +71,16 @@ def maze_fitness(ga_instance, solution, solution_idx):
     ROWS = 20
     COLS = 20
 
-    # Run first maze-runner through maze
-    maze = generate_solvable_maze(ROWS, COLS)
-    player_pos = [0, 0]  # Starting position (top-left corner)
+    # Run first maze-runner through maze, the walk is table lookups on the compiled maze
+    built_maze = get_maze(ROWS, COLS)
     goal = [ROWS -1, COLS -1]
-    moves = 0
-    smartness = 0 #indicator of not running into walls
-
-
-    for move in solution:
-            x, y = player_pos # x = columns and y = rows
-            if player_pos[0] == 19 and player_pos[1] ==19:
-                smartness += 100
-            elif move == 8 and y > 0 and maze[y - 1][x] == 0:  # Move up
-                player_pos[1] -= 1
-                moves += 1
-            elif move == 2 and y < ROWS - 1 and maze[y + 1][x] == 0:  # Move down
-                player_pos[1] += 1
-                moves += 1
-            elif move == 4 and x > 0 and maze[y][x - 1] == 0:  # Move left
-                player_pos[0] -= 1
-                moves += 1
-            elif move == 6 and x < COLS - 1 and maze[y][x + 1] == 0:  # Move right
-                player_pos[0] += 1
-                moves += 1
-            else:
-                #print(f"Move '{move}' hit a wall or is out of bounds!")
-                smartness-=1
+    smartness, moves, x, y = walk_genome(built_maze, solution) # smartness = indicator of not running into walls
+    player_pos = [x, y]
 
     # Final distance to the center after the sequence
     distance_to_goal_manhattan = calculate_distance(player_pos[0], player_pos[1], goal[0], goal[1])
 
-    distance_to_goal = shortest_path_distance(maze,(player_pos[0],player_pos[1]),(goal[0],goal[1]))
+    distance_to_goal = built_maze.goal_distance(player_pos[0], player_pos[1])
 
     final_player_pos = player_pos[0], player_pos[1]
     #print(final_player_pos)
@@ -170,6 +90,15 @@ def maze_fitness(ga_instance, solution, solution_idx):
     return smartness, distance_to_goal*-1 # multiplying by -1 because we want solutions with higher values, and 0 is the best
 
 
+def maze_fitness_batch(ga_instance, solutions, solution_indices):
+    # Batched version of maze_fitness for pygad's fitness_batch_size, same values row for row
+    ROWS = 20
+    COLS = 20
+
+    result = evaluate_population(solutions, get_maze(ROWS, COLS))
+    return batch_fitness_values(result)
+
+
 
 ###
     ###
@@ -184,23 +113,65 @@ def maze_fitness(ga_instance, solution, solution_idx):
 #OMG pygad makes this so simple
 def on_gen(ga_instance):
     print("Generation : ", ga_instance.generations_completed)
-    print("Fitness of the best solution :", ga_instance.best_solution()[1])
-
-ga_instance = pygad.GA(gene_space = [4,8,6,2],
-                       gene_type = int,
-                       num_generations = 1000,
-                       num_parents_mating = 6,
-                       fitness_func = maze_fitness,
-                       initial_population = create_population(100),
-                       parent_selection_type = "sss",
-                       keep_elitism = 0,
-                       keep_parents = 2,
-                       crossover_type = "scattered",
-                       crossover_probability = .4,
-                       mutation_type = "random",
-                       mutation_percent_genes = 1,
-                       #on_generation = on_gen
-                       )
+    # Fitness is already there from this generation, best_solution() would evaluate everyone again
+    print("Fitness of the best solution :", ga_instance.best_solution(ga_instance.last_generation_fitness)[1])
+
+# Everything about the GA except the fitness function and the population,
+# shared by build_ga and island_ga so both run the same algorithm
+GA_CONFIG = dict(gene_space = [4,8,6,2],
+                 gene_type = int,
+                 num_generations = 1000,
+                 num_parents_mating = 6,
+                 parent_selection_type = "sss",
+                 keep_elitism = 0,
+                 keep_parents = 2,
+                 crossover_type = "scattered",
+                 crossover_probability = .4,
+                 mutation_type = "random",
+                 mutation_percent_genes = 1,
+                 #on_generation = on_gen
+                 )
+
+def build_ga(fitness_batch_size = None, evaluator = None, pop_size = 100, seed = 12, on_generation = None, wrap_fitness = None, engine = "pygad",
+             config = None, genome_length = 200):
+    # fitness_batch_size > 1 switches to the vectorized maze_fitness_batch,
+    # an evaluator (e.g. parallel_fitness.ParallelEvaluator) gets the whole population in one call.
+    # The same seed gives the same run: the population and the GA's operators draw from
+    # separate streams of one RunStreams. pygad only takes an int seed for all its operators,
+    # GAEngine gets the streams and keeps selection, crossover and mutation apart.
+    # config replaces GA_CONFIG, e.g. one point of an experiments.py sweep
+    streams = RunStreams(seed)
+    if evaluator is not None:
+        fitness_func, fitness_batch_size = evaluator, pop_size
+    elif fitness_batch_size not in (None, 1):
+        fitness_func = maze_fitness_batch
+    else:
+        fitness_func = maze_fitness
+    if wrap_fitness is not None:
+        # e.g. MetricsRecorder.timed, same signature in and out
+        fitness_func = wrap_fitness(fitness_func)
+    # engine = "native" runs the same GA_CONFIG on ga_engine.GAEngine's uint8 matrix instead of pygad
+    ga_class = GAEngine if engine == "native" else pygad.GA
+    ga_instance = ga_class(fitness_func = fitness_func,
+                           fitness_batch_size = fitness_batch_size,
+                           initial_population = create_population(pop_size, streams.generator("population"), genome_length),
+                           random_seed = streams if engine == "native" else streams.int_seed("ga"),
+                           **dict(GA_CONFIG if config is None else config, on_generation = on_generation))
+    # Operator timers only record while profiling is on (--profile or MAZE_PROFILE=1)
+    return profiling.instrument_ga(ga_instance)
+
+
+COLS = 20
+ROWS = 20
+def show_maze_progression(maze_runner, replay_path = None):
+    # Run first maze-runner through maze, the start then the position after every move,
+    # same picture as print_maze but one write per frame.
+    # replay_path (.gif / .npy) saves the replay instead of printing it
+    built_maze = get_maze(ROWS, COLS)
+    if replay_path is not None:
+        export_replay(replay_path, built_maze, maze_runner)
+    else:
+        print_frames(built_maze, trajectory(built_maze, maze_runner))
 
 
 ###
@@ -212,50 +183,143 @@ ga_instance = pygad.GA(gene_space = [4,8,6,2],
     ###
     ###
 ###
-maze = generate_solvable_maze(20,20)
-print_maze(maze,(0,0))
-ga_instance.run()
-
-
-
-solution, solution_fitness, solution_idx = ga_instance.best_solution()
-print("Parameters of the best solution : {solution}".format(solution=solution))
-print("Fitness value of the best solution = {solution_fitness}".format(solution_fitness=solution_fitness))
-best_maze_runner = list(solution)
-
-COLS = 20
-ROWS = 20
-def show_maze_progression(maze_runner):
-    # Run first maze-runner through maze
-    maze = generate_solvable_maze(20, 20)
-    player_pos = [0, 0]  # Starting position (top-left corner)
-    moves = 0
-    smartness = 0 #indicator of not running into walls
-
-    for move in maze_runner:
-            x, y = player_pos # x = columns and y = rows
-            if move == 8 and y > 0 and maze[y - 1][x] == 0:  # Move up
-                player_pos[1] -= 1
-                moves += 1
-            elif move == 2 and y < ROWS - 1 and maze[y + 1][x] == 0:  # Move down
-                player_pos[1] += 1
-                moves += 1
-            elif move == 4 and x > 0 and maze[y][x - 1] == 0:  # Move left
-                player_pos[0] -= 1
-                moves += 1
-            elif move == 6 and x < COLS - 1 and maze[y][x + 1] == 0:  # Move right
-                player_pos[0] += 1
-                moves += 1
-            else:
-                #print(f"Move '{move}' hit a wall or is out of bounds!")
-                smartness-=1
-            print_maze(maze,(x,y))
-
-
-user_input = input("show progression? y/n")
-
-if user_input == "y":
-    show_maze_progression(best_maze_runner)
-else: print("bye")
-
-
+def check_evaluator_flags(workers = None, incremental = False, cache_size = None, curriculum = None, feature_weights = None):
+    # One fitness evaluator per run. The fitness cache composes with the process pool,
+    # anything else would silently lose a setting
+    chosen = [flag for flag, on in (("workers", workers is not None and workers > 1), ("incremental", incremental),
+                                    ("curriculum", curriculum), ("features", feature_weights)) if on]
+    if len(chosen) > 1:
+        raise ValueError("{flags} pick different fitness evaluators, use one of them".format(flags=" and ".join(chosen)))
+    if cache_size and chosen and chosen[0] != "workers":
+        raise ValueError("the fitness cache only works with workers, not {flag}".format(flag=chosen[0]))
+
+def main(workers = None, incremental = False, cache_size = None, curriculum = None, reducer = "mean", checkpoint_dir = None, checkpoint_every = 50, metrics_path = None, profile = False, profile_out = None, replay_path = None, engine = "pygad", archive_dir = None, feature_weights = None):
+    # profile (or MAZE_PROFILE=1) prints a per-phase breakdown after the run.
+    # profile_out: .prof for a cProfile of the GA run (python -m pstats), .json for a Chrome trace of the phases.
+    # engine = "native" runs the GA on ga_engine.GAEngine instead of pygad
+    check_evaluator_flags(workers, incremental, cache_size, curriculum, feature_weights)
+    if profile or profile_out:
+        profiling.enable()
+    cprofile = profiling.cprofile_to(profile_out) if profile_out and profile_out.endswith(".prof") else nullcontext()
+
+    maze = generate_solvable_maze(20,20)
+    print_maze(maze,(0,0))
+
+    # With a checkpoint_dir the run saves itself every checkpoint_every generations
+    # and picks up from the newest checkpoint there if one exists
+    if checkpoint_dir and engine != "pygad":
+        raise ValueError("checkpoints save pygad's RNG state, they need engine='pygad'")
+    writer = CheckpointWriter(checkpoint_dir, checkpoint_every) if checkpoint_dir else None
+
+    # Per-generation stats to a .csv / .jsonl / .parquet file, written in the background
+    recorder = MetricsRecorder(open_sink(metrics_path), on_generation = writer) if metrics_path else None
+    on_generation = recorder if recorder is not None else writer
+    # Every generation's genomes and fitness appended to memory-mapped files, see ga_archive
+    archiver = ArchiveRecorder(GenerationArchive(archive_dir), on_generation = on_generation) if archive_dir else None
+    if archiver is not None:
+        on_generation = archiver
+    wrap_fitness = recorder.timed if recorder is not None else None
+
+    def run_ga(ga_instance):
+        if writer is not None:
+            resumed = resume_ga(ga_instance, checkpoint_dir, GA_CONFIG["num_generations"])
+            if resumed is not None:
+                print("Resuming from generation {generation}".format(generation=resumed))
+                if recorder is not None:
+                    # Keep the resumed run's metrics up to the checkpoint and add to them
+                    recorder.sink.resume(resumed)
+        if archiver is not None:
+            archiver.start(ga_instance)
+        with cprofile:
+            ga_instance.run()
+        if writer is not None:
+            writer.close()
+        if recorder is not None:
+            recorder.close()
+        if archiver is not None:
+            archiver.close()
+            print("Archived {count} generations to {path}".format(count=len(archiver.archive), path=archive_dir))
+
+    # workers > 1 evaluates fitness on a process pool instead of one core
+    if workers is not None and workers > 1:
+        with ParallelEvaluator(ROWS, COLS, workers = workers, cache_size = cache_size) as evaluator:
+            ga_instance = build_ga(evaluator = evaluator, on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+            run_ga(ga_instance)
+        if cache_size:
+            print("Fitness cache (all workers): {hits} hits, {misses} misses".format(hits=evaluator.cache_hits, misses=evaluator.cache_misses))
+    elif cache_size:
+        # Identical genomes come back every generation, only new ones get walked
+        evaluator = CachedFitness(get_maze(ROWS, COLS), FitnessCache(cache_size))
+        ga_instance = build_ga(evaluator = evaluator, on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+        run_ga(ga_instance)
+        print("Fitness cache: {info}, hit rate {rate:.1%}".format(info=evaluator.cache.info(), rate=evaluator.cache.hit_rate()))
+    elif curriculum:
+        # Score on several seeded mazes at once so the GA can't just memorize seed 42
+        evaluator = CurriculumFitness(curriculum_mazes(range(42, 42 + curriculum), sizes = [(ROWS, COLS)]), reducer = reducer)
+        ga_instance = build_ga(evaluator = evaluator, on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+        run_ga(ga_instance)
+    elif incremental:
+        # Children resume their walk from the last checkpoint shared with an earlier genome
+        evaluator = IncrementalEvaluator(get_maze(ROWS, COLS))
+        ga_instance = build_ga(evaluator = evaluator, on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+        run_ga(ga_instance)
+        print("Gene steps skipped by checkpoints: {saved:.1%}".format(saved=evaluator.saved_fraction()))
+    elif feature_weights:
+        # Smartness shaped by walk features, e.g. rewarding coverage or penalizing dead ends
+        evaluator = FeatureFitness(get_maze(ROWS, COLS), feature_weights)
+        ga_instance = build_ga(evaluator = evaluator, on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+        run_ga(ga_instance)
+    else:
+        ga_instance = build_ga(on_generation = on_generation, wrap_fitness = wrap_fitness, engine = engine)
+        run_ga(ga_instance)
+
+
+
+    if profiling.is_enabled():
+        print(profiling.report())
+        if profile_out and profile_out.endswith(".json"):
+            profiling.export_chrome_trace(profile_out)
+
+    # Reuse the last generation's fitness instead of evaluating everyone again
+    solution, solution_fitness, solution_idx = ga_instance.best_solution(ga_instance.last_generation_fitness)
+    print("Parameters of the best solution : {solution}".format(solution=solution))
+    print("Fitness value of the best solution = {solution_fitness}".format(solution_fitness=solution_fitness))
+    print("Maze cache: {info}".format(info=maze_cache_info()))
+    best_maze_runner = list(solution)
+
+    if replay_path is not None:
+        show_maze_progression(best_maze_runner, replay_path)
+        print("Replay saved to {path}".format(path=replay_path))
+        return
+
+    user_input = input("show progression? y/n")
+
+    if user_input == "y":
+        show_maze_progression(best_maze_runner)
+    else: print("bye")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type = int, default = None, help = "fitness worker processes, default is serial")
+    parser.add_argument("--incremental", action = "store_true", help = "resume children's walks from shared checkpoints")
+    parser.add_argument("--fitness-cache", type = int, default = None, help = "memoize fitness for up to this many genomes")
+    parser.add_argument("--curriculum", type = int, default = None, help = "score on this many seeded mazes, starting at seed 42")
+    parser.add_argument("--reducer", default = "mean", help = "how curriculum scores combine: mean, min, max, median or q<0..1>")
+    parser.add_argument("--checkpoint-dir", default = None, help = "save checkpoints here and resume from the newest one")
+    parser.add_argument("--checkpoint-every", type = int, default = 50, help = "generations between checkpoints")
+    parser.add_argument("--metrics", default = None, help = "per-generation stats file, .csv, .jsonl or .parquet")
+    parser.add_argument("--profile", action = "store_true", help = "time maze building, walks, BFS and GA operators, same as MAZE_PROFILE=1")
+    parser.add_argument("--profile-out", default = None, help = "also write a .prof (cProfile) or .json (Chrome trace) file")
+    parser.add_argument("--replay", default = None, help = "save the best runner's walk as a .gif or .npy instead of asking to print it")
+    parser.add_argument("--archive", default = None, help = "append every generation's genomes and fitness to memory-mapped files here")
+    parser.add_argument("--features", default = None, help = "add weighted walk features to smartness, e.g. distinct_cells=1,dead_end_visits=-2")
+    parser.add_argument("--engine", choices = ("pygad", "native"), default = "pygad", help = "native runs the same config on the NumPy GA in ga_engine")
+    args = parser.parse_args()
+    try:
+        feature_weights = parse_weights(args.features) if args.features else None
+        check_evaluator_flags(args.workers, args.incremental, args.fitness_cache, args.curriculum, feature_weights)
+    except ValueError as error:
+        parser.error(str(error))
+    main(args.workers, args.incremental, args.fitness_cache, args.curriculum, args.reducer, args.checkpoint_dir, args.checkpoint_every, args.metrics,
+         args.profile, args.profile_out, args.replay, args.engine, args.archive, feature_weights)
@@ -0,0 +1,146 @@
+import sys
+import struct
+import numpy as np
+from maze_walk import walk_cells
+from move_codec import NUMPAD
+
+"""Replay a genome's walk without a display: one string write per text frame, or a GIF / NPY frame stack"""
+
+# Frame stack cell values, also the GIF palette indices
+PATH, WALL, GOAL, RUNNER, TRAIL = 0, 1, 2, 3, 4
+PALETTE = (
+    (255, 255, 255),  # path
+    (40, 40, 40),  # wall
+    (0, 180, 0),  # goal
+    (220, 0, 0),  # runner
+    (255, 200, 200),  # trail, cells the runner has been on
+    (0, 0, 0), (0, 0, 0), (0, 0, 0),  # GIF palettes come in powers of two
+)
+
+
+def trajectory(maze, genome, alphabet=NUMPAD):
+    # Cell of the runner in every frame: the start, then after each gene. Cells are y * cols + x
+    return np.array([maze.start_cell] + walk_cells(maze, genome, alphabet), dtype=np.intp)
+
+
+def text_frame_base(maze):
+    # print_maze's layout as one bytearray: "# " / ". " / "O " per cell, a newline per row
+    # and a blank line after the maze. Returns the buffer and the byte offset of each cell
+    symbols = np.where(maze.walls == 1, ord("#"), ord(".")).astype(np.uint8)
+    goal_x, goal_y = maze.goal
+    symbols[goal_y, goal_x] = ord("O")
+    row_width = 2 * maze.cols + 1
+    base = np.full((maze.rows, row_width), ord(" "), dtype=np.uint8)
+    base[:, 0:-1:2] = symbols
+    base[:, -1] = ord("\n")
+    offsets = (np.arange(maze.rows)[:, None] * row_width + 2 * np.arange(maze.cols)).ravel()
+    return bytearray(base.tobytes() + b"\n"), offsets
+
+
+def print_frames(maze, cells, out=None):
+    # One write per frame, each frame is the precomputed maze with a P on the runner's cell
+    out = sys.stdout if out is None else out
+    base, offsets = text_frame_base(maze)
+    for cell in cells.tolist():
+        frame = base.copy()
+        frame[offsets[cell]] = ord("P")
+        out.write(frame.decode("ascii"))
+
+
+def frame_stack(maze, cells, trail=True):
+    # frames x rows x cols uint8 of PATH / WALL / GOAL / RUNNER / TRAIL, built with array ops only
+    frames = len(cells)
+    board = maze.walls.astype(np.uint8).ravel().copy()
+    board[maze.goal_cell] = GOAL
+    stack = np.repeat(board[None, :], frames, axis=0)
+    if trail:
+        # A cell is trail from the frame the runner first reaches it on
+        first_visit = np.full(maze.rows * maze.cols, frames, dtype=np.intp)
+        np.minimum.at(first_visit, cells, np.arange(frames))
+        visited = np.arange(frames)[:, None] >= first_visit[None, :]
+        stack[visited & (stack == PATH)] = TRAIL
+    stack[np.arange(frames), cells] = RUNNER
+    return stack.reshape(frames, maze.rows, maze.cols)
+
+
+def _lzw_encode(pixels, min_code_size):
+    # GIF flavoured LZW of a flat uint8 index array, returns the packed bytes
+    clear, end = 1 << min_code_size, (1 << min_code_size) + 1
+    out = bytearray()
+    bit_buffer = bit_count = 0
+    code_size = min_code_size + 1
+
+    def reset():
+        return {bytes([i]): i for i in range(clear)}, end + 1
+
+    table, next_code = reset()
+
+    def emit(code):
+        nonlocal bit_buffer, bit_count
+        bit_buffer |= code << bit_count
+        bit_count += code_size
+        while bit_count >= 8:
+            out.append(bit_buffer & 0xFF)
+            bit_buffer >>= 8
+            bit_count -= 8
+
+    emit(clear)
+    data = pixels.tobytes()
+    prefix = data[:1]
+    for i in range(1, len(data)):
+        extended = prefix + data[i:i + 1]
+        if extended in table:
+            prefix = extended
+            continue
+        emit(table[prefix])
+        if next_code < 4096:
+            table[extended] = next_code
+            next_code += 1
+            # The decoder adds its entry one code later, so widen once the next code no longer fits
+            if next_code > (1 << code_size) and code_size < 12:
+                code_size += 1
+        else:
+            emit(clear)
+            table, next_code = reset()
+            code_size = min_code_size + 1
+        prefix = data[i:i + 1]
+    emit(table[prefix])
+    emit(end)
+    if bit_count:
+        out.append(bit_buffer & 0xFF)
+    return bytes(out)
+
+
+def write_gif(path, stack, scale=8, frame_ms=50, palette=PALETTE):
+    # Animated GIF of a frame stack, each cell drawn as a scale x scale block, loops forever.
+    # No imaging library needed
+    frames = np.repeat(np.repeat(np.asarray(stack, dtype=np.uint8), scale, axis=1), scale, axis=2)
+    _, height, width = frames.shape
+    palette_bits = max((len(palette) - 1).bit_length(), 1)
+    color_table = bytes(channel for color in palette for channel in color).ljust(3 << palette_bits, b"\0")
+    min_code_size = max(palette_bits, 2)
+
+    with open(path, "wb") as f:
+        f.write(b"GIF89a" + struct.pack("<HHBBB", width, height, 0x80 | (palette_bits - 1), 0, 0) + color_table)
+        f.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")  # loop forever
+        for frame in frames:
+            f.write(b"\x21\xF9\x04\x00" + struct.pack("<H", max(frame_ms // 10, 1)) + b"\x00\x00")
+            f.write(b"\x2C" + struct.pack("<HHHHB", 0, 0, width, height, 0) + bytes([min_code_size]))
+            data = _lzw_encode(frame.ravel(), min_code_size)
+            for start in range(0, len(data), 255):
+                block = data[start:start + 255]
+                f.write(bytes([len(block)]) + block)
+            f.write(b"\x00")
+        f.write(b"\x3B")
+
+
+def export_replay(path, maze, genome, alphabet=NUMPAD, **gif_options):
+    # .npy saves the frame stack, .gif renders it
+    stack = frame_stack(maze, trajectory(maze, genome, alphabet))
+    if path.endswith(".npy"):
+        np.save(path, stack)
+    elif path.endswith(".gif"):
+        write_gif(path, stack, **gif_options)
+    else:
+        raise ValueError(f"replay file must end in .gif or .npy, got {path!r}")
+    return stack
@@ -0,0 +1,36 @@
+import numpy as np
+
+"""Per-run RNG hierarchy, one SeedSequence per run and an independent stream per consumer and per worker"""
+
+# Consumers that draw randomness during a run, each gets its own child SeedSequence.
+# pygad takes a single int seed for all of its operators, so under pygad "ga" covers
+# selection, crossover and mutation; ga_engine.GAEngine takes the RunStreams itself.
+# Mazes aren't drawn from here, they're carved from their own int seed (maze_provider)
+STREAMS = ("population", "mutation", "crossover", "ga", "workers")
+
+
+class RunStreams:
+    # RunStreams(seed).generator("population") is the same stream every time for the
+    # same seed, and drawing from it never moves any other stream or the global
+    # random / np.random state
+
+    def __init__(self, seed=None):
+        self.seed_sequence = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self._children = dict(zip(STREAMS, self.seed_sequence.spawn(len(STREAMS))))
+        self._generators = {}
+
+    def generator(self, name):
+        # One Generator per stream, repeated calls keep drawing from where it left off
+        if name not in self._generators:
+            self._generators[name] = np.random.default_rng(self._children[name])
+        return self._generators[name]
+
+    def int_seed(self, name):
+        # 32-bit seed for APIs that only take ints (pygad's random_seed)
+        return int(self._children[name].generate_state(1)[0])
+
+    def spawn(self, n):
+        # Independent RunStreams for n workers / islands, worker i gets the same
+        # streams no matter how many processes the work is spread over.
+        # Like SeedSequence.spawn, a second call hands out the next n, not the same ones
+        return [RunStreams(child) for child in self._children["workers"].spawn(n)]
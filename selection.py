@@ -0,0 +1,66 @@
+import numpy as np
+
+"""Parent selection over a 1-D score array, every mode is sub-quadratic and returns population indices"""
+
+SELECTION_MODES = ("truncation", "tournament", "sus")
+
+
+def truncation_select(scores, k):
+    # Indices of the k highest scores, best first, O(n + k log k).
+    # Each individual appears at most once even when scores tie, ties are ordered by index
+    scores = np.asarray(scores)
+    n = len(scores)
+    k = min(int(k), n)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    top = np.argpartition(scores, n - k)[n - k:] if k < n else np.arange(n)
+    return top[np.lexsort((top, -scores[top]))]
+
+
+def tournament_select(scores, k, tournament_size=3, rng=None):
+    # k tournaments of tournament_size random entrants, each won by its highest score, O(k * tournament_size)
+    scores = np.asarray(scores)
+    rng = np.random.default_rng() if rng is None else rng
+    entrants = rng.integers(0, len(scores), size=(int(k), tournament_size))
+    winners = np.argmax(scores[entrants], axis=1)
+    return entrants[np.arange(len(entrants)), winners]
+
+
+def sus_select(scores, k, rng=None):
+    # Stochastic universal sampling, k evenly spaced pointers over the cumulative
+    # fitness wheel, O(n + k log n). Scores are shifted so the worst one still gets
+    # a sliver of the wheel, the repo's fitness values go negative
+    scores = np.asarray(scores, dtype=np.float64)
+    rng = np.random.default_rng() if rng is None else rng
+    k = int(k)
+    if k <= 0:
+        return np.empty(0, dtype=np.intp)
+    weights = scores - scores.min() + 1e-9
+    wheel = np.cumsum(weights)
+    step = wheel[-1] / k
+    pointers = rng.uniform(0, step) + step * np.arange(k)
+    return np.minimum(np.searchsorted(wheel, pointers, side="right"), len(scores) - 1)
+
+
+def fitness_order(fitness):
+    # Indices best-first. For (smartness, -distance) rows the closest to the goal wins
+    # and ties go to the smarter runner, a 1-D fitness is just sorted high to low
+    fitness = np.asarray(fitness)
+    if fitness.ndim == 1:
+        return np.argsort(-fitness, kind="stable")
+    return np.lexsort((-fitness[:, 0], -fitness[:, 1]))
+
+
+def is_better(fitness, other):
+    # Same ordering as fitness_order for a single pair
+    return (fitness[1], fitness[0]) > (other[1], other[0])
+
+
+def select(scores, k, mode="truncation", rng=None, **kwargs):
+    if mode == "truncation":
+        return truncation_select(scores, k)
+    if mode == "tournament":
+        return tournament_select(scores, k, rng=rng, **kwargs)
+    if mode == "sus":
+        return sus_select(scores, k, rng=rng)
+    raise ValueError(f"mode must be one of {SELECTION_MODES}, got {mode!r}")
@@ -1,5 +1,6 @@
-import random
 import numpy as np
+from maze_provider import get_maze
+from move_codec import WASD, encode_genes
 
 # Maze dimensions
 """ROWS, COLS = 5, 5  # Small 5x5 maze for simplicity
@@ -39,51 +40,8 @@ for i in range(5):
 ### Do Maze Stuff
 ROWS,COLS = 15, 15 # Small 15x15 maze for simplicity
 def generate_solvable_maze(rows, cols, seed=42):
-    # Set the random seed for reproducibility
-    random.seed(seed)
-    
-    # Initialize all cells as walls
-    maze = [[1 for _ in range(cols)] for _ in range(rows)]
-    
-    # Starting position
-    start_x, start_y = 0, 0
-    maze[start_y][start_x] = 0  # Start point is open
-    
-    # Stack for DFS and visited set
-    stack = [(start_x, start_y)]
-    visited = set(stack)
-
-    directions = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # Up, Down, Left, Right
-
-    # DFS to carve out the maze
-    while stack:
-        x, y = stack[-1]
-        
-        # Find all unvisited neighbors
-        neighbors = []
-        for dx, dy in directions:
-            nx, ny = x + dx * 2, y + dy * 2
-            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in visited:
-                neighbors.append((nx, ny))
-
-        if neighbors:
-            # Choose a random neighbor
-            nx, ny = random.choice(neighbors)
-            
-            # Remove wall between current cell and chosen neighbor
-            maze[(y + ny) // 2][(x + nx) // 2] = 0
-            maze[ny][nx] = 0  # Make the neighbor cell a path
-            
-            # Mark as visited and push to stack
-            visited.add((nx, ny))
-            stack.append((nx, ny))
-        else:
-            # Backtrack if no unvisited neighbors
-            stack.pop()
-
-    # Ensure the center of the maze is open
-    maze[rows // 2][cols // 2] = 0
-    return maze
+    # Built once per (rows, cols, seed) by maze_provider, this hands back a mutable copy
+    return get_maze(rows, cols, seed, goal_policy="center").to_list()
 
 
 # Calculate Manhattan distance to the center
@@ -120,22 +78,17 @@ def main():
     #move_sequence = input("Enter your move sequence (w/a/s/d): ").strip().lower()
     move_sequence = population[0]
     
-    for move in move_sequence:
-        x, y = player_pos
-        if move == 'w' and y > 0 and maze[y - 1][x] == 0:  # Move up
-            player_pos[1] -= 1
-            moves += 1
-        elif move == 's' and y < ROWS - 1 and maze[y + 1][x] == 0:  # Move down
-            player_pos[1] += 1
-            moves += 1
-        elif move == 'a' and x > 0 and maze[y][x - 1] == 0:  # Move left
-            player_pos[0] -= 1
-            moves += 1
-        elif move == 'd' and x < COLS - 1 and maze[y][x + 1] == 0:  # Move right
-            player_pos[0] += 1
-            moves += 1
-        else:
+    # w/a/s/d go through the shared codec, then each move is a lookup in the compiled maze
+    built_maze = get_maze(ROWS, COLS, goal_policy="center")
+    next_cell, hits_wall = built_maze.transition_lists
+    cell = built_maze.start_cell
+    for move, code in zip(move_sequence, encode_genes(move_sequence, WASD).tolist()):
+        if hits_wall[cell][code]:
             print(f"Move '{move}' hit a wall or is out of bounds!")
+        else:
+            cell = next_cell[cell][code]
+            moves += 1
+    player_pos = [cell % COLS, cell // COLS]
 
     # Final distance to the center after the sequence
     distance_to_center = calculate_distance(player_pos[0], player_pos[1], center_pos[0], center_pos[1])
@@ -0,0 +1,183 @@
+from collections import namedtuple
+import numpy as np
+from batch_fitness import BatchResult
+from move_codec import NUMPAD, encode_genes
+from profiling import count, timed
+
+"""Shaping features of a whole walk, gathered during the walk itself: coverage, revisits, dead ends, best distance, goal arrival"""
+
+# BatchResult's fields plus, per runner:
+#   distinct_cells   cells stood on at least once, the start included
+#   revisits         moves onto a cell already stood on, always moves + 1 - distinct_cells
+#   dead_end_visits  moves onto a Maze.dead_ends cell
+#   best_distance    smallest BFS distance to the goal anywhere along the walk
+#   first_goal_step  genes used when the goal was first reached, -1 if never
+FEATURES = ("distinct_cells", "revisits", "dead_end_visits", "best_distance", "first_goal_step")
+TrajectoryFeatures = namedtuple("TrajectoryFeatures", BatchResult._fields + FEATURES)
+
+
+def genome_features(maze, genome, alphabet=NUMPAD, goal_bonus=100, stop_at_goal=True):
+    # Scalar twin of evaluate_features, one runner, the visited set is a Python int used as a bitset
+    next_cell, hits_wall = maze.transition_lists
+    distance = maze.distance.ravel().tolist()
+    dead_ends = maze.dead_ends.tolist()
+    goal_cell = maze.goal_cell
+    cell = maze.start_cell
+    visited = 1 << cell
+    smartness = moves = dead_end_visits = 0
+    distinct = 1
+    best_distance = distance[cell]
+    first_goal_step = 0 if cell == goal_cell else -1
+
+    codes = encode_genes(genome, alphabet).tolist()
+    for i, code in enumerate(codes):
+        if stop_at_goal and cell == goal_cell:
+            smartness += goal_bonus * (len(codes) - i)
+            break
+        if hits_wall[cell][code]:
+            smartness -= 1
+            continue
+        cell = next_cell[cell][code]
+        moves += 1
+        if not visited >> cell & 1:
+            visited |= 1 << cell
+            distinct += 1
+        dead_end_visits += dead_ends[cell]
+        best_distance = min(best_distance, distance[cell])
+        if first_goal_step < 0 and cell == goal_cell:
+            first_goal_step = i + 1
+
+    x, y = cell % maze.cols, cell // maze.cols
+    return TrajectoryFeatures(smartness, moves, x, y, distance[cell], distinct, moves + 1 - distinct,
+                              dead_end_visits, best_distance, first_goal_step)
+
+
+@timed("walk.features")
+def evaluate_features(population, maze, goal_bonus=100, stop_at_goal=True, alphabet=NUMPAD, features=FEATURES):
+    # Same walk and same smartness / moves / x / y / distance as batch_fitness.evaluate_population,
+    # with the features above riding along in the one pass: per step a few more gathers
+    # (dead-end entry, distance, bit) and one byte of each runner's visited bitset.
+    # Nothing scales with the maze beyond the bitset, which is only touched where runners go.
+    # Only the listed features are computed, the others come back as None
+    unknown = set(features) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"unknown features {sorted(unknown)}, known: {FEATURES}")
+    track_cells = "distinct_cells" in features or "revisits" in features
+    track_dead_ends = "dead_end_visits" in features
+    track_best = "best_distance" in features
+    population = np.asarray(population)
+    if population.ndim != 2:
+        raise ValueError(f"population must be 2-D (individuals x genes), got shape {population.shape}")
+    n, genes = population.shape
+    count("walk.genomes", n)
+    steps = np.ascontiguousarray(encode_genes(population, alphabet).T)
+    cells = maze.rows * maze.cols
+    goal_cell, start = maze.goal_cell, maze.start_cell
+
+    # Flat (cell * 5 + code) tables, one index array serves every gather of a step
+    width = maze.next_cell.shape[1]
+    next_cell = maze.next_cell.ravel()
+    hits_wall = maze.hits_wall.ravel()
+    enters_dead_end = maze.enters_dead_end.ravel()
+    distance = maze.distance.ravel()
+    bit = np.left_shift(1, np.arange(cells) & 7).astype(np.uint8)
+
+    # n x ceil(cells / 8) bits, cell c is bit c & 7 of byte c >> 3 in runner r's row
+    row_bytes = (cells + 7) // 8 if track_cells else 0
+    visited = np.zeros(n * row_bytes, dtype=np.uint8)
+    if track_cells:
+        visited[np.arange(n) * row_bytes + (start >> 3)] = bit[start]
+
+    cell = np.full(n, start, dtype=np.intp)
+    smartness = np.zeros(n, dtype=np.int64)
+    moves = np.zeros(n, dtype=np.int64)
+    distinct = np.ones(n, dtype=np.int64)
+    dead_end_visits = np.zeros(n, dtype=np.int64)
+    best_distance = np.full(n, distance[start], dtype=np.int64)
+    first_goal_step = np.full(n, 0 if start == goal_cell else -1, dtype=np.int64)
+
+    # Runners still walking, like evaluate_population finished ones are written back and dropped
+    active = np.arange(n)
+    a_cell, a_smartness, a_moves, a_distinct = cell, smartness.copy(), moves.copy(), distinct.copy()
+    a_dead, a_best = dead_end_visits.copy(), best_distance.copy()
+    a_row = active * row_bytes
+    for i in range(genes + 1):
+        if stop_at_goal:
+            arrived = a_cell == goal_cell
+            if arrived.any():
+                done = active[arrived]
+                cell[done], smartness[done] = a_cell[arrived], a_smartness[arrived] + goal_bonus * (genes - i)
+                moves[done], distinct[done] = a_moves[arrived], a_distinct[arrived]
+                dead_end_visits[done], best_distance[done] = a_dead[arrived], a_best[arrived]
+                first_goal_step[done] = i
+                keep = ~arrived
+                active, a_cell, a_smartness, a_moves, a_distinct, a_dead, a_best, a_row = (
+                    active[keep], a_cell[keep], a_smartness[keep], a_moves[keep], a_distinct[keep],
+                    a_dead[keep], a_best[keep], a_row[keep])
+        if i == genes or len(active) == 0:
+            break
+        t = a_cell * width + steps[i, active]
+        hit = hits_wall.take(t)
+        a_cell = next_cell.take(t)
+        a_smartness -= hit
+        a_moves += ~hit
+        if track_dead_ends:
+            a_dead += enters_dead_end.take(t)
+        if track_best:
+            np.minimum(a_best, distance.take(a_cell), out=a_best)
+        if track_cells:
+            byte, mask = a_row + (a_cell >> 3), bit.take(a_cell)
+            seen = visited.take(byte)
+            a_distinct += (seen & mask) == 0
+            visited[byte] = seen | mask
+        if not stop_at_goal and "first_goal_step" in features:
+            first = (a_cell == goal_cell) & (first_goal_step < 0)
+            first_goal_step[first] = i + 1
+    # Whoever never made it
+    cell[active], smartness[active], moves[active], distinct[active] = a_cell, a_smartness, a_moves, a_distinct
+    dead_end_visits[active], best_distance[active] = a_dead, a_best
+
+    x, y = cell % maze.cols, cell // maze.cols
+    values = dict(distinct_cells=distinct, revisits=moves + 1 - distinct, dead_end_visits=dead_end_visits,
+                  best_distance=best_distance, first_goal_step=first_goal_step)
+    return TrajectoryFeatures(smartness, moves, x, y, distance[cell],
+                              **{name: values[name] if name in features else None for name in FEATURES})
+
+
+def parse_weights(text):
+    # "distinct_cells=1,dead_end_visits=-2" -> {"distinct_cells": 1.0, "dead_end_visits": -2.0}
+    weights = {}
+    for item in text.split(","):
+        name, _, weight = item.partition("=")
+        name = name.strip()
+        if name not in FEATURES:
+            raise ValueError(f"unknown feature {name!r}, known: {FEATURES}")
+        try:
+            weights[name] = float(weight) if weight else 1.0
+        except ValueError:
+            raise ValueError(f"feature weight must be a number, got {item!r}") from None
+    return weights
+
+
+class FeatureFitness:
+    # Batched pygad fitness_func that shapes maze_fitness with walk features, e.g.
+    #   build_ga(evaluator = FeatureFitness(get_maze(20, 20), {"distinct_cells": 1, "dead_end_visits": -2}))
+    # Fitness stays (smartness, -distance), smartness gets sum(weight * feature) added.
+    # Only the weighted features are computed
+
+    def __init__(self, maze, weights, goal_bonus=100, alphabet=NUMPAD):
+        unknown = set(weights) - set(FEATURES)
+        if unknown:
+            raise ValueError(f"unknown features {sorted(unknown)}, known: {FEATURES}")
+        self.maze = maze
+        self.weights = dict(weights)
+        self.goal_bonus = goal_bonus
+        self.alphabet = alphabet
+
+    def evaluate(self, population):
+        result = evaluate_features(population, self.maze, self.goal_bonus, alphabet=self.alphabet, features=tuple(self.weights))
+        smartness = result.smartness + sum(weight * getattr(result, name) for name, weight in self.weights.items())
+        return np.column_stack((smartness, result.distance * -1))
+
+    def __call__(self, ga_instance, solutions, solution_indices):
+        return self.evaluate(solutions)